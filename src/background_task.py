@@ -0,0 +1,53 @@
+from PyQt6 import QtCore
+
+from timing import get_profiler
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskWorker(QtCore.QThread):
+    """Runs fn(*args, task=self, **kwargs) in a separate thread.
+    fn reports progress with task.report_progress(done, total) and calls
+    task.check_cancelled() between chunks to stop on user request.
+    Signals are delivered to the GUI thread through queued connections."""
+
+    progress = QtCore.pyqtSignal(object, object)
+    result_ready = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, fn, *args, **kwargs) -> None:
+        super().__init__()
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_requested
+
+    def check_cancelled(self):
+        if self._cancel_requested:
+            raise TaskCancelled()
+
+    def report_progress(self, done: int, total: int):
+        self.progress.emit(done, total)
+
+    def run(self):
+        try:
+            profiler = get_profiler()
+            if profiler:
+                result = profiler.run_thread(self._fn, *self._args, task=self, **self._kwargs)
+            else:
+                result = self._fn(*self._args, task=self, **self._kwargs)
+        except TaskCancelled:
+            self.cancelled.emit()
+        except Exception as ex:
+            self.failed.emit(str(ex))
+        else:
+            self.result_ready.emit(result)
@@ -0,0 +1,155 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from h5_paged_source import H5PagedSource
+from mark_index import MarkArrays
+from marks_storage import read_marks_array, load_marks, MARKS_SUFFIX
+from event_detection import ThresholdDetector
+from csv_exporter import export_csv, EXPORT_CHUNK_ROWS
+from binary_exporter import export_binary
+
+
+BATCH_FORMATS = ('csv', 'h5', 'npy', 'parquet')
+# суффикс имени результата, если он совпал бы с исходным файлом
+EXPORT_SUFFIX = ".export"
+# цвет меток, найденных по порогу: красный с alpha = Mark.get_alpha() (0.5); Qt здесь не нужен
+THRESHOLD_MARK_RGBA = (255, 0, 0, 127)
+
+
+def get_column_index(headers: dict, column: str) -> int:
+    for index, name in headers.items():
+        if name == column:
+            return index
+    if column.isdigit() and int(column) in headers:
+        return int(column)
+    raise Exception("Колонка не найдена: " + column)
+
+
+def detect_threshold_marks(source: H5PagedSource, column: str, threshold: float,
+                           below: bool = False, min_duration: float = 0.0) -> MarkArrays:
+    """Marks over intervals where a column is past the threshold, in one pass over pages"""
+    col = get_column_index(source.get_headers(), column)
+    detector = ThresholdDetector(threshold, below, min_duration)
+    for start, block in source.iter_pages(EXPORT_CHUNK_ROWS):
+        detector.feed(block[:, 0], block[:, col])
+    xmin, xmax = detector.finish()
+    return MarkArrays(xmin, xmax, np.tile(THRESHOLD_MARK_RGBA, (xmin.shape[0], 1)))
+
+
+def get_output_path(path: str, out_dir: str, fmt: str) -> str:
+    """<stem>.<fmt> in out_dir or next to the file; <stem>.export.<fmt> if that is the input file itself"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir or os.path.dirname(path), stem + "." + fmt)
+    if os.path.realpath(out_path) == os.path.realpath(path):
+        out_path = os.path.join(out_dir or os.path.dirname(path), stem + EXPORT_SUFFIX + "." + fmt)
+    return out_path
+
+
+def process_file(path: str, options: dict) -> tuple:
+    """Opens one file, marks it and exports it. Runs in a worker process.
+    Returns (output path, rows, marks, seconds)"""
+    start_time = time.perf_counter()
+    source = H5PagedSource(path, options['dataset'])
+    try:
+        if options['threshold_column'] is not None:
+            mark_index = detect_threshold_marks(source, options['threshold_column'], options['threshold'],
+                                                options['below'], options['min_duration'])
+        elif options['marks']:
+            mark_index = MarkArrays.from_records(read_marks_array(options['marks']))
+        else:
+            records = load_marks(path, source.dataset_name)
+            mark_index = MarkArrays.from_records(records) if records is not None else MarkArrays([], [], [])
+
+        rows = source.shape[0]
+        out_path = get_output_path(path, options['out_dir'], options['format'])
+        blocks = source.iter_pages(EXPORT_CHUNK_ROWS)
+        if options['format'] == 'csv':
+            export_csv(out_path, blocks, rows, source.get_headers(), mark_index,
+                       options['delimiter'], options['accuracy'])
+        else:
+            export_binary(out_path, blocks, rows, source.get_headers(), source.get_column_dtypes(), mark_index)
+    finally:
+        source.close()
+    return out_path, rows, len(mark_index), time.perf_counter() - start_time
+
+
+def is_batch_output(path: str) -> bool:
+    """True for files written by the batch mode or the GUI next to the data: exports and marks"""
+    name = os.path.basename(path)
+    return name.endswith(MARKS_SUFFIX) or os.path.splitext(name)[0].endswith(EXPORT_SUFFIX)
+
+
+def expand_files(patterns: list) -> list:
+    """Files of the patterns; own outputs matched by a pattern are skipped, so that
+    a repeated run over *.h5 does not process the results of the previous one"""
+    files = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            files.extend(path for path in sorted(glob.glob(pattern)) if not is_batch_output(path))
+        else:
+            files.append(pattern)
+    return files
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m batch",
+        description="Пакетная обработка h5 файлов без GUI: метки из файла или по порогу и экспорт")
+    parser.add_argument('files', nargs='+', help="h5 файлы или шаблоны (*.h5)")
+    parser.add_argument('-d', '--dataset', default=None, help="набор данных (по умолчанию первый)")
+    parser.add_argument('-m', '--marks', default=None, help="файл меток (.marks.h5 или экспорт h5 с segments)")
+    parser.add_argument('--threshold-column', default=None, help="колонка для поиска меток по порогу")
+    parser.add_argument('--threshold', type=float, default=0.0, help="значение порога")
+    parser.add_argument('--below', action='store_true', help="отмечать значения ниже порога")
+    parser.add_argument('--min-duration', type=float, default=0.0, help="минимальная длина метки по оси x")
+    parser.add_argument('-f', '--format', choices=BATCH_FORMATS, default='csv', help="формат экспорта")
+    parser.add_argument('-o', '--out-dir', default=None, help="папка для результатов (по умолчанию рядом с файлом)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="число процессов")
+    parser.add_argument('--delimiter', default=';', help="разделитель csv")
+    parser.add_argument('--accuracy', type=int, default=4, help="точность значений в csv")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    files = expand_files(args.files)
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    options = {
+        'dataset': args.dataset,
+        'marks': args.marks,
+        'threshold_column': args.threshold_column,
+        'threshold': args.threshold,
+        'below': args.below,
+        'min_duration': args.min_duration,
+        'format': args.format,
+        'out_dir': args.out_dir,
+        'delimiter': args.delimiter,
+        'accuracy': args.accuracy,
+    }
+
+    failed = 0
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(files)))) as executor:
+        futures = {executor.submit(process_file, path, options): path for path in files}
+        for future in as_completed(futures):
+            try:
+                out_path, rows, marks, seconds = future.result()
+                print(f"{futures[future]} -> {out_path}: {rows} rows, {marks} marks, {seconds:.2f} s")
+            except Exception as ex:
+                failed += 1
+                print(f"{futures[future]}: ошибка: {ex}", file=sys.stderr)
+
+    print(f"{len(files) - failed}/{len(files)} files in {time.perf_counter() - start_time:.2f} s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6 import QtWidgets, QtGui
+
+from synthetic_session import make_session, SAMPLE_STEP_MS
+from h5_loader import load_h5
+from mark import Mark
+from mark_index import MarkIndex
+from table_data_model import TableDataModel
+from table_marks_model import TableMarksModel
+from csv_exporter import export_csv, EXPORT_CHUNK_ROWS
+from plot_pyramid import build_pyramid
+from plot_model import MyPlot, GraphTypes
+
+
+DEFAULT_ROWS = (1e4, 1e5, 1e6)
+# метка на каждые MARK_EVERY_ROWS строк
+MARK_EVERY_ROWS = 1000
+COLLISION_CHECKS = 1000
+# во сколько раз медленнее базового замера считается регрессией
+REGRESSION_RATIO = 1.2
+
+# запуск приложения в новом процессе: импорты, окно, один проход цикла событий
+STARTUP_SCRIPT = """
+import sys
+import main
+from PyQt6 import QtWidgets, QtCore
+app = QtWidgets.QApplication(sys.argv)
+window = main.MainApp()
+window.show()
+QtCore.QTimer.singleShot(0, app.quit)
+app.exec()
+"""
+
+
+def measure(fn, repeat: int) -> float:
+    """Best wall time of fn() over repeat runs"""
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def make_marks(rows: int) -> list:
+    color = QtGui.QColor(255, 0, 0)
+    color.setAlphaF(Mark.get_alpha())
+    step = MARK_EVERY_ROWS * SAMPLE_STEP_MS
+    return [Mark(float(x), float(x + step // 2), color) for x in range(0, rows * SAMPLE_STEP_MS, step)]
+
+
+def run_size(rows: int, work_dir: str, repeat: int, skip_plot: bool) -> dict:
+    path = os.path.join(work_dir, f"session_{rows}.h5")
+    if not os.path.exists(path):
+        make_session(path, rows, chunk_rows=4096)
+
+    results = {}
+    loaded = {}
+
+    def decode():
+        loaded['headers'], loaded['data'] = load_h5(path)
+
+    results['decode'] = measure(decode, repeat)
+    headers, data = loaded['headers'], loaded['data']
+
+    marks = make_marks(rows)
+    mark_index = MarkIndex(marks)
+    table_data = TableDataModel()
+    table_data.set_headers(headers)
+    table_data.set_items(data)
+    results['update_marked_rows'] = measure(lambda: table_data.update_marked_rows(mark_index), repeat)
+
+    table_marks = TableMarksModel()
+    table_marks.set_marks(marks)
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(data[0, 0], data[-1, 0], COLLISION_CHECKS).tolist()
+    probes = [Mark(x, x + SAMPLE_STEP_MS, marks[0].color) for x in starts]
+    results['have_collisions'] = measure(lambda: [table_marks.have_collisions(m) for m in probes], repeat) \
+        / COLLISION_CHECKS
+
+    csv_path = os.path.join(work_dir, "export.csv")
+    results['export_csv'] = measure(
+        lambda: export_csv(csv_path, table_data.iter_blocks(EXPORT_CHUNK_ROWS), rows, headers, mark_index,
+                           accuracy=4), repeat)
+    os.remove(csv_path)
+
+    if not skip_plot:
+        plot = MyPlot()
+        plot.get_canvas().resize(1200, 600)
+        plot.set_pyramid(build_pyramid([data], data.shape[1] - 1))
+        results['draw_plot'] = measure(lambda: plot.draw_plot(data, headers, marks, GraphTypes.plot), repeat)
+    return results
+
+
+def measure_startup(repeat: int) -> float:
+    """Best wall time of a cold launch: a new interpreter showing the main window"""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    return measure(lambda: subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=src_dir, check=True), repeat)
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """(size, name, seconds, baseline seconds) of measurements slower than REGRESSION_RATIO * baseline"""
+    slower = []
+    for size, measured in results.items():
+        for name, seconds in measured.items():
+            base = baseline.get(size, {}).get(name)
+            if base and seconds > base * REGRESSION_RATIO:
+                slower.append((size, name, seconds, base))
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры времени горячих участков на синтетических файлах")
+    parser.add_argument('--rows', type=float, nargs='+', default=DEFAULT_ROWS, help="размеры файлов, например 1e4 1e8")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--work-dir', default=None, help="папка для сгенерированных файлов (по умолчанию временная)")
+    parser.add_argument('--no-plot', action='store_true', help="не замерять отрисовку графика")
+    parser.add_argument('--no-startup', action='store_true', help="не замерять запуск приложения")
+    parser.add_argument('--save', default=None, help="сохранить результаты в json")
+    parser.add_argument('--compare', default=None, help="json с базовыми результатами")
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    results = {}
+    if not args.no_startup:
+        results['startup'] = {'launch': measure_startup(args.repeat)}
+        print(f"{'startup':>12} {'launch':<20} {results['startup']['launch'] * 1000:12.3f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = args.work_dir or tmp
+        for rows in (int(r) for r in args.rows):
+            results[str(rows)] = run_size(rows, work_dir, args.repeat, args.no_plot)
+            for name, seconds in results[str(rows)].items():
+                print(f"{rows:>12} {name:<20} {seconds * 1000:12.3f} ms")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(results, json.load(f))
+        for size, name, seconds, base in slower:
+            print(f"REGRESSION {size} {name}: {seconds * 1000:.3f} ms, baseline {base * 1000:.3f} ms")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
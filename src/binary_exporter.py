@@ -0,0 +1,161 @@
+import os
+
+import h5py
+import numpy as np
+
+from mark_index import MarkIndex
+from timing import timed
+
+
+EXPORT_FORMATS = ('.h5', '.hdf5', '.npy', '.parquet')
+# Размер чанка набора данных в выходном h5 файле
+H5_CHUNK_ROWS = 65536
+
+SEGMENT_DTYPE = np.dtype([
+    ('xmin', 'f8'),
+    ('xmax', 'f8'),
+    ('rgba', 'u1', (4,)),
+    ('row_start', 'i8'),
+    ('row_end', 'i8'),
+])
+
+
+def get_record_dtype(headers: dict, column_dtypes: list) -> np.dtype:
+    return np.dtype([(name, dtype) for name, dtype in zip(headers.values(), column_dtypes)])
+
+
+def to_records(block: np.ndarray, record_dtype: np.dtype) -> np.ndarray:
+    """2D float block -> structured array with native column types"""
+    records = np.empty(shape=block.shape[0], dtype=record_dtype)
+    for col, name in enumerate(record_dtype.names):
+        records[name] = block[:, col]
+    return records
+
+
+class SegmentsBuilder:
+    """Marks as a segments table (xmin, xmax, rgba, row_start, row_end).
+    Row ranges [row_start, row_end) are accumulated block by block: for a sorted time
+    column, row_start = rows with x < xmin, row_end = rows with x <= xmax."""
+
+    def __init__(self, mark_index: MarkIndex):
+        self._segments = np.zeros(shape=len(mark_index), dtype=SEGMENT_DTYPE)
+        self._segments['xmin'] = mark_index.xmin
+        self._segments['xmax'] = mark_index.xmax
+        self._segments['rgba'] = mark_index.get_rgba()
+
+    def add_block(self, x: np.ndarray):
+        self._segments['row_start'] += np.searchsorted(x, self._segments['xmin'], side='left')
+        self._segments['row_end'] += np.searchsorted(x, self._segments['xmax'], side='right')
+
+    def get(self) -> np.ndarray:
+        return self._segments
+
+
+class _H5Writer:
+    def __init__(self, path: str, rows: int, record_dtype: np.dtype):
+        self._file = h5py.File(path, "w")
+        self._ds = self._file.create_dataset('data', shape=(rows,), dtype=record_dtype,
+                                             chunks=(max(1, min(rows, H5_CHUNK_ROWS)),),
+                                             compression='gzip', compression_opts=4, shuffle=True)
+
+    def write(self, start: int, records: np.ndarray):
+        self._ds[start:start + records.shape[0]] = records
+
+    def close(self, segments: np.ndarray = None):
+        if segments is not None:
+            self._file.create_dataset('segments', data=segments)
+        self._file.close()
+
+
+class _NpyWriter:
+    """Structured .npy written through a memmap; segments go to <name>.segments.npy"""
+
+    def __init__(self, path: str, rows: int, record_dtype: np.dtype):
+        self._path = path
+        self._mm = np.lib.format.open_memmap(path, mode='w+', dtype=record_dtype, shape=(rows,))
+
+    def write(self, start: int, records: np.ndarray):
+        self._mm[start:start + records.shape[0]] = records
+
+    def close(self, segments: np.ndarray = None):
+        self._mm.flush()
+        del self._mm
+        if segments is not None:
+            np.save(get_segments_path(self._path), segments)
+
+
+class _ParquetWriter:
+    """Parquet through the optional pyarrow package; segments go to <name>.segments.parquet"""
+
+    def __init__(self, path: str, rows: int, record_dtype: np.dtype):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise Exception("Для сохранения в parquet нужен пакет pyarrow")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._path = path
+        self._writer = None
+
+    def _table(self, records: np.ndarray):
+        columns = {}
+        for name in records.dtype.names:
+            column = records[name]
+            # колонки-массивы (rgba) сохраняются списками фиксированной длины
+            columns[name] = list(column) if column.ndim > 1 else column
+        return self._pa.table(columns)
+
+    def write(self, start: int, records: np.ndarray):
+        table = self._table(records)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self, segments: np.ndarray = None):
+        if self._writer is not None:
+            self._writer.close()
+        if segments is not None:
+            self._pq.write_table(self._table(segments), get_segments_path(self._path))
+
+
+def get_segments_path(path: str) -> str:
+    stem, ext = os.path.splitext(path)
+    return stem + ".segments" + ext
+
+
+@timed('export binary')
+def export_binary(path: str, blocks, rows: int, headers: dict, column_dtypes: list,
+                  mark_index: MarkIndex, task=None):
+    """Writes (start, 2D block) blocks with native column dtypes to .h5/.hdf5 (gzip chunks,
+    'data' and 'segments' datasets), .npy or .parquet (segments in a separate file).
+    mark_index should be a snapshot (MarkIndex.copy) when running in a worker."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.h5', '.hdf5'):
+        writer_class = _H5Writer
+    elif ext == '.npy':
+        writer_class = _NpyWriter
+    elif ext == '.parquet':
+        writer_class = _ParquetWriter
+    else:
+        raise Exception("Неизвестный формат файла: " + ext)
+
+    record_dtype = get_record_dtype(headers, column_dtypes)
+    segments = SegmentsBuilder(mark_index)
+    writer = writer_class(path, rows, record_dtype)
+    try:
+        for start, block in blocks:
+            if task:
+                task.check_cancelled()
+            writer.write(start, to_records(block, record_dtype))
+            segments.add_block(block[:, 0])
+            if task:
+                task.report_progress(start + block.shape[0], rows)
+    except BaseException:
+        writer.close()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    writer.close(segments.get())
+    return path
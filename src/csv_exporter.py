@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+
+from mark_index import MarkIndex
+from formatting import format_values
+from timing import timed
+
+
+# Строк в одном блоке записи: память ~ EXPORT_CHUNK_ROWS * колонки строк
+EXPORT_CHUNK_ROWS = 65536
+
+
+def get_mark_colors(mark_index: MarkIndex) -> np.ndarray:
+    """Color names of the marks with ' ' appended, so that mark position -1 means 'no mark'"""
+    return np.array(['#{:02x}{:02x}{:02x}'.format(*rgba[:3]) for rgba in mark_index.get_rgba().tolist()] + [' '])
+
+
+@timed('export csv')
+def export_csv(path: str, blocks, rows: int, headers: dict, mark_index: MarkIndex,
+               delimiter: str = ';', accuracy: int = None, task=None):
+    """Writes (start, 2D block) blocks to a csv file one by one, with the mark color
+    as the last column. Memory does not depend on the number of rows.
+    mark_index should be a snapshot (MarkIndex.copy) when running in a worker.
+    The partially written file is removed if the task is cancelled."""
+    colors = get_mark_colors(mark_index)
+
+    names = list(headers.values())
+    names.append('mark color')
+
+    try:
+        with open(path, 'w', newline='') as f:
+            f.write(delimiter.join(names) + delimiter + "\n")
+            for start, block in blocks:
+                if task:
+                    task.check_cancelled()
+
+                text = format_values(block, accuracy)
+                marks = colors[mark_index.assign(block[:, 0])]
+                lines = np.hstack((text, marks[:, np.newaxis])).tolist()
+                f.write("\n".join(map(delimiter.join, lines)) + "\n")
+
+                if task:
+                    task.report_progress(start + block.shape[0], rows)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return path
@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def minmax_per_pixel(x: np.ndarray, y: np.ndarray, pixels: int):
+    """Splits x range into `pixels` equal intervals and keeps min and max of every channel
+    in each of them. Returns x and 2D y of a polyline with min/max interleaved."""
+    if x.shape[0] <= 2 * pixels or x[-1] <= x[0]:
+        return x, y
+
+    edges = np.linspace(x[0], x[-1], pixels + 1)[:-1]
+    starts = np.unique(np.searchsorted(x, edges))
+
+    ymin = np.minimum.reduceat(y, starts, axis=0)
+    ymax = np.maximum.reduceat(y, starts, axis=0)
+
+    out_y = np.empty(shape=(2 * starts.shape[0], y.shape[1]))
+    out_y[0::2] = ymin
+    out_y[1::2] = ymax
+    return np.repeat(x[starts], 2), out_y
+
+
+def get_visible_range(x: np.ndarray, xmin: float, xmax: float):
+    """Row range [start, stop) of sorted x inside [xmin, xmax] with one row margin on both sides"""
+    start = max(0, np.searchsorted(x, xmin) - 1)
+    stop = min(x.shape[0], np.searchsorted(x, xmax, side='right') + 1)
+    return start, stop
+
+
+def iter_density_per_pixel(x: np.ndarray, y: np.ndarray, xlim: tuple, ylim: tuple, width: int, height: int):
+    """Number of points of every channel in each pixel of a width x height raster over
+    xlim x ylim, one channel at a time. Yields (channel, (height, width) counts), row 0 at ylim[0];
+    channels without points in the raster are skipped."""
+    if not x.shape[0] or xlim[1] <= xlim[0] or ylim[1] <= ylim[0]:
+        return
+
+    pixels = width * height
+    cols = (x - xlim[0]) * (width / (xlim[1] - xlim[0]))
+    # границы проверяются до приведения к int: оно округляет к нулю, и точки левее xlim[0]
+    # меньше чем на пиксель попали бы в колонку 0
+    col_ok = (cols >= 0) & (cols < width)
+    with np.errstate(invalid='ignore'):
+        col = cols.astype('int64')
+    for k in range(y.shape[1]):
+        rows = (y[:, k] - ylim[0]) * (height / (ylim[1] - ylim[0]))
+        ok = col_ok & (rows >= 0) & (rows < height)
+        if not ok.any():
+            continue
+        # точки вне растра попадают в лишнюю последнюю ячейку, которая отбрасывается
+        with np.errstate(invalid='ignore'):
+            pixel = np.where(ok, rows.astype('int64') * width + col, pixels)
+        yield k, np.bincount(pixel, minlength=pixels + 1)[:pixels].reshape(height, width)
@@ -0,0 +1,60 @@
+import numpy as np
+from matplotlib.colors import to_rgba_array
+from matplotlib.patches import Patch
+
+from decimation import iter_density_per_pixel, get_visible_range
+
+
+# непрозрачность пикселя с одной точкой, чтобы редкие точки были видны рядом с плотными
+MIN_ALPHA = 0.3
+
+
+class DensityRaster:
+    """Scatter of all channels as one image: points are counted per screen pixel,
+    every channel gets its color with log-scaled opacity, overlapping channels are mixed.
+    The image has the size of the axes, so drawing it does not depend on the number of points.
+    Channels are accumulated one at a time into float32 planes of the image size, one pair
+    per distinct color, so memory does not grow with the number of channels."""
+
+    def __init__(self, ax, labels: list):
+        self._ax = ax
+        self._colors = to_rgba_array([f"C{k % 10}" for k in range(len(labels))])[:, :3]
+        # каналы одного цвета копятся в общие плоскости изображения
+        self._palette, self._color_of = np.unique(self._colors, axis=0, return_inverse=True)
+        self.image = ax.imshow(np.zeros(shape=(1, 1, 4)), origin='lower', aspect='auto',
+                               interpolation='nearest')
+        ax.legend(handles=[Patch(color=color, label=label) for color, label in zip(self._colors, labels)])
+
+    def update(self, data: np.ndarray, xlim: tuple, ylim: tuple):
+        """Recomputes the image for the visible part of data [x, channels...]"""
+        width = max(1, int(self._ax.bbox.width))
+        height = max(1, int(self._ax.bbox.height))
+        start, stop = get_visible_range(data[:, 0], *xlim)
+
+        # вес канала в пикселе: MIN_ALPHA + (1 - MIN_ALPHA) * log1p(count) / top, где top -
+        # наибольший log1p(count) по всем каналам; он известен только в конце, поэтому
+        # по каждому цвету копятся отдельно число каналов с точками и сумма log1p(count)
+        hits = np.zeros(shape=(self._palette.shape[0], height, width), dtype='float32')
+        logs = np.zeros(shape=(self._palette.shape[0], height, width), dtype='float32')
+        log_max = np.zeros(shape=(height, width), dtype='float32')
+        weight = np.empty(shape=(height, width), dtype='float32')
+        for k, counts in iter_density_per_pixel(data[start:stop, 0], data[start:stop, 1:],
+                                                xlim, ylim, width, height):
+            color = self._color_of[k]
+            hits[color] += counts > 0
+            np.log1p(counts, out=weight, casting='unsafe')
+            logs[color] += weight
+            np.maximum(log_max, weight, out=log_max)
+
+        top = log_max.max()
+        scale = (1 - MIN_ALPHA) / top if top > 0 else 0
+        # суммарный вес каналов каждого цвета в пикселе
+        weights = MIN_ALPHA * hits + scale * logs
+        total = weights.sum(axis=0)
+        rgba = np.zeros(shape=(height, width, 4), dtype='float32')
+        rgba[..., :3] = np.tensordot(weights, self._palette.astype('float32'), axes=(0, 0)) / \
+            np.where(total > 0, total, 1)[..., np.newaxis]
+        rgba[..., 3] = np.where(hits.any(axis=0), MIN_ALPHA + scale * log_max, 0)
+
+        self.image.set_data(rgba)
+        self.image.set_extent((xlim[0], xlim[1], ylim[0], ylim[1]))
@@ -0,0 +1,39 @@
+from PyQt6 import QtWidgets
+from ui.detect_events_dialog import Ui_Dialog
+
+from event_detection import EventRules
+
+
+class DetectEventsDialog(QtWidgets.QDialog):
+    def __init__(self, headers: dict, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.ui = Ui_Dialog()
+        self.ui.setupUi(self)
+
+        self.ui.btnAdd.clicked.connect(self.accept)
+        self.ui.btnCancel.clicked.connect(self.reject)
+
+        for col, name in headers.items():
+            if col > 0:
+                self.ui.comboBoxChannel.addItem(name, col)
+        for rule in EventRules:
+            self.ui.comboBoxRule.addItem(rule.value, rule)
+        self.ui.comboBoxRule.currentIndexChanged.connect(self.on_rule_changed)
+        self.on_rule_changed()
+
+    def on_rule_changed(self):
+        # окно нужно только для RMS
+        self.ui.spinBoxWindow.setEnabled(self.ui.comboBoxRule.currentData() == EventRules.rms)
+
+    def get_data(self):
+        if self.ui.comboBoxChannel.currentData() is None:
+            raise Exception("Нет каналов для поиска событий")
+        return {
+            "channel": self.ui.comboBoxChannel.currentData(),
+            "rule": self.ui.comboBoxRule.currentData(),
+            "threshold": self.ui.spinBoxThreshold.value(),
+            "below": self.ui.checkBoxBelow.isChecked(),
+            "window": self.ui.spinBoxWindow.value(),
+            "merge_gap": self.ui.spinBoxMergeGap.value(),
+            "min_duration": self.ui.spinBoxMinDuration.value(),
+        }
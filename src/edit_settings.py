@@ -3,7 +3,8 @@ from ui.edit_settings_dialog import Ui_Dialog
 
 
 class SettingsEditDialog(QtWidgets.QDialog):
-    def __init__(self, csv_delimiter, csv_accuracy, *args, **kwargs) -> None:
+    def __init__(self, csv_delimiter, csv_accuracy, pyramid_sidecar: bool = False, marks_in_source: bool = False,
+                 *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.ui = Ui_Dialog()
         self.ui.setupUi(self)
@@ -13,9 +14,13 @@ class SettingsEditDialog(QtWidgets.QDialog):
 
         self.ui.txtCsvDelimeter.setText(csv_delimiter)
         self.ui.txtCsvAccuracy.setText(str(csv_accuracy))
+        self.ui.chkPyramidSidecar.setChecked(pyramid_sidecar)
+        self.ui.chkMarksInSource.setChecked(marks_in_source)
 
     def get_data(self):
         return {
             "csv_delimiter": self.ui.txtCsvDelimeter.text(),
             "csv_accuracy": self.ui.txtCsvAccuracy.text(),
+            "pyramid_sidecar": self.ui.chkPyramidSidecar.isChecked(),
+            "marks_in_source": self.ui.chkMarksInSource.isChecked(),
         }
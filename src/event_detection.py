@@ -0,0 +1,131 @@
+from enum import Enum
+
+import numpy as np
+
+
+class ThresholdDetector:
+    """Intervals where a channel is above (or below) a threshold, fed block by block.
+    An interval spans x of its first and last sample past the threshold; intervals
+    continuing across block borders are joined, shorter than min_duration are dropped."""
+
+    def __init__(self, threshold: float, below: bool = False, min_duration: float = 0.0):
+        self.threshold = threshold
+        self.below = below
+        self.min_duration = min_duration
+        self._active = False
+        self._start_x = None
+        self._last_x = None
+        self._xmin = []
+        self._xmax = []
+
+    def feed(self, x: np.ndarray, y: np.ndarray):
+        if not x.shape[0]:
+            return
+        active = y < self.threshold if self.below else y > self.threshold
+        edges = np.diff(active.astype('int8'), prepend=np.int8(self._active))
+        starts = x[np.flatnonzero(edges == 1)]
+        ends = np.flatnonzero(edges == -1)
+        # последний отмеченный отсчёт перед концом интервала, возможно из прошлого блока
+        end_x = np.where(ends > 0, x[np.maximum(ends - 1, 0)], self._last_x if self._last_x is not None else 0)
+
+        if self._active:
+            starts = np.concatenate(([self._start_x], starts))
+        if active[-1]:
+            self._start_x = starts[-1]
+            starts = starts[:-1]
+        self._add(starts, end_x)
+
+        self._active = bool(active[-1])
+        self._last_x = x[-1]
+
+    def _add(self, xmin: np.ndarray, xmax: np.ndarray):
+        keep = xmax - xmin >= self.min_duration
+        self._xmin.append(np.asarray(xmin, dtype='float64')[keep])
+        self._xmax.append(np.asarray(xmax, dtype='float64')[keep])
+
+    def finish(self):
+        """Closes an interval still open at the end of data. Returns (xmin, xmax) arrays"""
+        if self._active:
+            self._add(np.array([self._start_x]), np.array([self._last_x]))
+            self._active = False
+        xmin = np.concatenate(self._xmin) if self._xmin else np.empty(0)
+        xmax = np.concatenate(self._xmax) if self._xmax else np.empty(0)
+        return xmin, xmax
+
+
+# строк в одном куске при поиске событий по всему набору данных
+DETECT_CHUNK_ROWS = 1 << 20
+
+
+class EventRules(Enum):
+    threshold = 'Threshold'
+    derivative = 'Derivative'
+    rms = 'RMS'
+
+
+def merge_intervals(xmin: np.ndarray, xmax: np.ndarray, gap: float = 0.0, min_duration: float = 0.0):
+    """Joins sorted intervals separated by at most gap, then drops shorter than min_duration"""
+    if xmin.shape[0]:
+        # новая группа начинается там, где промежуток до предыдущего интервала больше gap
+        first = np.flatnonzero(np.concatenate(([True], xmin[1:] - xmax[:-1] > gap)))
+        xmin = xmin[first]
+        xmax = np.maximum.reduceat(xmax, first)
+    keep = xmax - xmin >= min_duration
+    return xmin[keep], xmax[keep]
+
+
+class EventDetector:
+    """Intervals where a feature of a channel is past a threshold, fed block by block:
+    the value itself (threshold), the absolute step between neighbouring samples (derivative)
+    or the RMS over the last `window` samples (rms). The tail of the previous block is kept
+    so that the feature does not depend on how the data is split into blocks."""
+
+    def __init__(self, rule: EventRules, threshold: float, below: bool = False, window: int = 1):
+        if window < 1:
+            raise Exception("Окно должно быть не меньше одного отсчёта")
+        self.rule = rule
+        self.window = window
+        self._tail = np.empty(0)
+        self._detector = ThresholdDetector(threshold, below)
+
+    def _feature(self, y: np.ndarray) -> np.ndarray:
+        if self.rule == EventRules.threshold:
+            return y
+        values = np.concatenate((self._tail, y))
+        skip = self._tail.shape[0]
+        if self.rule == EventRules.derivative:
+            # у самого первого отсчёта данных предыдущего нет, скачок считается нулевым
+            steps = np.abs(np.diff(values, prepend=values[:1]))
+            self._tail = values[-1:]
+            return steps[skip:]
+
+        sums = np.concatenate(([0.0], np.cumsum(values * values)))
+        stop = np.arange(skip + 1, values.shape[0] + 1)
+        start = np.maximum(stop - self.window, 0)
+        self._tail = values[-(self.window - 1):] if self.window > 1 else values[:0]
+        return np.sqrt(np.maximum(sums[stop] - sums[start], 0) / (stop - start))
+
+    def feed(self, x: np.ndarray, y: np.ndarray):
+        if not x.shape[0]:
+            return
+        self._detector.feed(x, self._feature(np.asarray(y, dtype='float64')))
+
+    def finish(self):
+        return self._detector.finish()
+
+
+def detect_events(row_reader, rows: int, channel: int, rule: EventRules, threshold: float, below: bool = False,
+                  window: int = 1, merge_gap: float = 0.0, min_duration: float = 0.0,
+                  chunk_rows: int = DETECT_CHUNK_ROWS, task=None):
+    """(xmin, xmax) arrays of events of a column read through row_reader(start, stop) in chunks;
+    events closer than merge_gap are joined into one interval"""
+    detector = EventDetector(rule, threshold, below, window)
+    for start in range(0, rows, chunk_rows):
+        if task:
+            task.check_cancelled()
+        block = row_reader(start, min(rows, start + chunk_rows))
+        detector.feed(block[:, 0], block[:, channel])
+        if task:
+            task.report_progress(min(rows, start + chunk_rows), rows)
+    xmin, xmax = detector.finish()
+    return merge_intervals(xmin, xmax, merge_gap, min_duration)
@@ -0,0 +1,58 @@
+from PyQt6 import QtWidgets
+from ui.filters_dialog import Ui_Dialog
+
+from signal_filter import FilterChain, BandPass, Notch
+
+
+class FiltersDialog(QtWidgets.QDialog):
+    def __init__(self, headers: dict, chains: dict, sample_rate: float, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.ui = Ui_Dialog()
+        self.ui.setupUi(self)
+
+        self.ui.btnAdd.clicked.connect(self.accept)
+        self.ui.btnCancel.clicked.connect(self.reject)
+
+        self._chains = chains
+        # 0 - все каналы, иначе номер колонки
+        self.ui.comboBoxChannel.addItem("Все каналы", 0)
+        for col, name in headers.items():
+            if col > 0:
+                self.ui.comboBoxChannel.addItem(name, col)
+        self.ui.comboBoxChannel.currentIndexChanged.connect(self.on_channel_changed)
+
+        if sample_rate:
+            self.ui.labelSampleRate.setText(f"Частота дискретизации: {sample_rate:g} Гц")
+        else:
+            self.ui.labelSampleRate.setText("Частота дискретизации неизвестна, фильтры не применяются")
+        self.on_channel_changed()
+
+    def on_channel_changed(self):
+        channel = self.ui.comboBoxChannel.currentData()
+        chain = self._chains.get(channel) if channel else next(iter(self._chains.values()), None)
+        self.ui.checkBoxBandPass.setChecked(False)
+        self.ui.checkBoxNotch.setChecked(False)
+        for f in chain.filters if chain else ():
+            if isinstance(f, BandPass):
+                self.ui.checkBoxBandPass.setChecked(True)
+                self.ui.spinBoxLow.setValue(f.low or 0)
+                self.ui.spinBoxHigh.setValue(f.high or 0)
+            elif isinstance(f, Notch):
+                self.ui.checkBoxNotch.setChecked(True)
+                self.ui.spinBoxNotch.setValue(f.freq)
+                self.ui.spinBoxNotchWidth.setValue(f.width)
+
+    def get_data(self):
+        filters = []
+        if self.ui.checkBoxBandPass.isChecked():
+            low = self.ui.spinBoxLow.value()
+            high = self.ui.spinBoxHigh.value()
+            if high and low >= high:
+                raise Exception("Нижняя частота должна быть меньше верхней")
+            filters.append(BandPass(low or None, high or None))
+        if self.ui.checkBoxNotch.isChecked():
+            filters.append(Notch(self.ui.spinBoxNotch.value(), self.ui.spinBoxNotchWidth.value()))
+        return {
+            "channel": self.ui.comboBoxChannel.currentData(),
+            "chain": FilterChain(filters),
+        }
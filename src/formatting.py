@@ -0,0 +1,8 @@
+import numpy as np
+
+
+def format_values(values: np.ndarray, accuracy: int = None) -> np.ndarray:
+    """Strings of values rounded to accuracy digits; the values themselves are not changed"""
+    if accuracy is not None:
+        values = np.around(values, accuracy)
+    return values.astype(str)
@@ -0,0 +1,81 @@
+import h5py
+from PyQt6 import QtWidgets, QtCore
+
+from ui.h5_browser_dialog import Ui_Dialog
+from h5_loader import describe_h5_object
+
+
+PATH_ROLE = QtCore.Qt.ItemDataRole.UserRole
+LOADED_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+
+
+class H5BrowserDialog(QtWidgets.QDialog):
+    """Tree of groups/datasets of an h5 file. Children, metadata and attributes
+    are read only when an item is expanded; dataset values are never read."""
+
+    def __init__(self, path: str, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.ui = Ui_Dialog()
+        self.ui.setupUi(self)
+
+        self._file = h5py.File(path, "r")
+
+        self.ui.btnOpen.clicked.connect(self.accept)
+        self.ui.btnCancel.clicked.connect(self.reject)
+        self.ui.treeItems.itemExpanded.connect(self.on_item_expanded)
+        self.ui.treeItems.itemDoubleClicked.connect(self.on_item_double_clicked)
+
+        self.setWindowTitle(self.windowTitle() + ": " + path)
+        self._add_children(self.ui.treeItems.invisibleRootItem(), self._file)
+        self.ui.treeItems.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
+
+    def _add_children(self, parent_item: QtWidgets.QTreeWidgetItem, group: h5py.Group):
+        for name in group.keys():
+            obj = group.get(name)
+            if obj is None:
+                continue  # битая внешняя ссылка
+
+            info = describe_h5_object(obj)
+            item = QtWidgets.QTreeWidgetItem([name, info["size"], info["dtype"], info["chunks"], info["compression"]])
+            item.setData(0, PATH_ROLE, obj.name)
+            item.setData(0, LOADED_ROLE, False)
+            if info["kind"] == "group" or len(obj.attrs):
+                item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+            if info["kind"] == "group":
+                item.setFlags(item.flags() & ~QtCore.Qt.ItemFlag.ItemIsSelectable)
+            parent_item.addChild(item)
+
+    def _add_attributes(self, parent_item: QtWidgets.QTreeWidgetItem, obj):
+        for name, value in obj.attrs.items():
+            item = QtWidgets.QTreeWidgetItem(["@" + name, str(value)])
+            item.setFlags(item.flags() & ~QtCore.Qt.ItemFlag.ItemIsSelectable)
+            item.setToolTip(1, str(value))
+            parent_item.addChild(item)
+
+    def on_item_expanded(self, item: QtWidgets.QTreeWidgetItem):
+        if not item.data(0, PATH_ROLE) or item.data(0, LOADED_ROLE):
+            return
+        item.setData(0, LOADED_ROLE, True)
+
+        obj = self._file[item.data(0, PATH_ROLE)]
+        self._add_attributes(item, obj)
+        if isinstance(obj, h5py.Group):
+            self._add_children(item, obj)
+        if item.childCount() == 0:
+            item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicator)
+
+    def on_item_double_clicked(self, item: QtWidgets.QTreeWidgetItem, column: int):
+        if item.data(0, PATH_ROLE) and isinstance(self._file[item.data(0, PATH_ROLE)], h5py.Dataset):
+            self.accept()
+
+    def get_data(self):
+        datasets = [item.data(0, PATH_ROLE) for item in self.ui.treeItems.selectedItems()
+                    if item.data(0, PATH_ROLE)]
+        return {
+            "datasets": datasets,
+            "lazy": self.ui.checkBoxLazy.isChecked(),
+        }
+
+    def done(self, result):
+        self._file.close()
+        super().done(result)
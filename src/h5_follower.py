@@ -0,0 +1,58 @@
+import h5py
+
+from h5_loader import decode_block, get_headers, get_column_dtypes, get_first_dataset_name
+
+
+# период опроса файла в режиме слежения, мс
+FOLLOW_POLL_MS = 200
+
+
+class H5Follower:
+    """Reads rows appended to a dataset of an h5 file that is still being written.
+    The file is opened in SWMR read mode, growth is seen through Dataset.refresh()
+    and every poll reads and decodes only the rows added since the previous one.
+    Files written without SWMR are reopened on every poll instead."""
+
+    def __init__(self, path: str, dataset_name: str = None):
+        self.path = path
+        self.dataset_name = dataset_name
+        self.swmr = True
+        try:
+            self._file = h5py.File(path, "r", libver='latest', swmr=True)
+        except (OSError, ValueError):
+            self.swmr = False
+            self._file = h5py.File(path, "r")
+        if self.dataset_name is None:
+            self.dataset_name = get_first_dataset_name(self._file)
+        self._ds = self._file[self.dataset_name]
+        self._headers = get_headers(self._ds.dtype, self._ds.shape)
+        self.rows_read = 0
+
+    def get_headers(self) -> dict:
+        return self._headers
+
+    def get_column_dtypes(self) -> list:
+        return get_column_dtypes(self._ds.dtype, self._ds.shape)
+
+    def _refresh(self):
+        if self.swmr:
+            self._ds.refresh()
+        else:
+            self._file.close()
+            self._file = h5py.File(self.path, "r")
+            self._ds = self._file[self.dataset_name]
+
+    def read_new(self):
+        """Decoded rows appended since the previous call (all rows on the first call) or None"""
+        self._refresh()
+        rows = self._ds.shape[0]
+        if rows <= self.rows_read:
+            return None
+        block = decode_block(self._ds[self.rows_read:rows])
+        self.rows_read = rows
+        return block
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,230 @@
+import sys
+import time
+
+import h5py
+import numpy as np
+
+from timing import stage_timer
+
+
+# Сколько строк читаем из файла за один раз: пиковая память = результат + один блок
+DEFAULT_CHUNK_ROWS = 1 << 18
+
+
+def get_field_columns(dtype: np.dtype) -> list:
+    """Returns a list of (field name, column count) for a dataset dtype.
+    Sub-array fields (e.g. 'f4', (3,)) occupy several columns."""
+    if dtype.names is None:
+        return [(None, 1)]
+
+    columns = []
+    for name in dtype.names:
+        field_dtype = dtype.fields[name][0]
+        count = int(np.prod(field_dtype.shape)) if field_dtype.shape else 1
+        columns.append((name, count))
+    return columns
+
+
+def get_headers(dtype: np.dtype, shape: tuple) -> dict:
+    """Column headers in the format used by TableDataModel: {index: name}"""
+    if dtype.names is None:
+        cols = shape[1] if len(shape) > 1 else 1
+        return {k: f"col{k}" for k in range(cols)}
+
+    names = []
+    for name, count in get_field_columns(dtype):
+        if count == 1:
+            names.append(name)
+        else:
+            names.extend(f"{name}[{i}]" for i in range(count))
+    return {k: v for k, v in enumerate(names)}
+
+
+def get_column_dtypes(dtype: np.dtype, shape: tuple) -> list:
+    """Native numpy dtype of every column, in the order of get_headers"""
+    if dtype.names is None:
+        cols = shape[1] if len(shape) > 1 else 1
+        return [dtype] * cols
+
+    dtypes = []
+    for name, count in get_field_columns(dtype):
+        field_dtype = dtype.fields[name][0]
+        dtypes.extend([field_dtype.base] * count)
+    return dtypes
+
+
+def get_datasets_column_dtypes(path: str, dataset_names: list) -> list:
+    """Column dtypes of datasets opened side by side (see load_h5_datasets)"""
+    with h5py.File(path, "r") as f:
+        dtypes = []
+        for name in dataset_names:
+            dtypes.extend(get_column_dtypes(f[name].dtype, f[name].shape))
+        return dtypes
+
+
+def decode_block(arr: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Converts a block of rows to a 2D float64 array column by column.
+    Each field is cast with a single vectorized assignment, so integer and
+    float fields can be mixed freely."""
+    if arr.dtype.names is None:
+        arr2d = arr.reshape(arr.shape[0], -1)
+        if out is None:
+            return arr2d.astype('float64')
+        out[...] = arr2d
+        return out
+
+    columns = get_field_columns(arr.dtype)
+    if out is None:
+        out = np.empty(shape=(arr.shape[0], sum(count for _, count in columns)), dtype='float64')
+
+    col = 0
+    for name, count in columns:
+        field = arr[name]
+        if count == 1:
+            out[:, col] = field
+        else:
+            out[:, col:col + count] = field.reshape(field.shape[0], count)
+        col += count
+    return out
+
+
+def get_memmap(ds):
+    """Maps a contiguous, unfiltered dataset straight from the file with np.memmap.
+    Returns a read-only structured view (pages are shared with the OS cache)
+    or None when the data cannot be mapped: chunked/compressed layout,
+    storage not allocated yet, variable-length types, non-default file driver."""
+    if ds.file.driver not in ('sec2', 'stdio'):
+        return None
+
+    plist = ds.id.get_create_plist()
+    if plist.get_layout() != h5py.h5d.CONTIGUOUS or plist.get_nfilters() > 0:
+        return None
+    if plist.get_external_count() > 0:
+        return None
+
+    offset = ds.id.get_offset()
+    if offset is None or ds.dtype.hasobject:
+        return None
+    if ds.id.get_type().get_size() != ds.dtype.itemsize:
+        return None
+    if ds.size == 0:
+        return None
+
+    return np.memmap(ds.file.filename, mode='r', dtype=ds.dtype, offset=offset, shape=ds.shape)
+
+
+def get_reader(ds):
+    """Object to read rows from: np.memmap when possible, else the h5py dataset itself.
+    Both support [start:stop] and [::step] slicing."""
+    mm = get_memmap(ds)
+    return mm if mm is not None else ds
+
+
+def iter_decode_dataset(ds, out: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Reads the dataset into `out` block by block.
+    Yields the number of rows decoded so far after every block.
+    Time of reading and decoding is recorded as 'read' and 'decode' stages
+    (for a memory-mapped dataset the actual reading happens in 'decode')."""
+    reader = get_reader(ds)
+    rows = ds.shape[0]
+    read_time = decode_time = 0.0
+    try:
+        for start in range(0, rows, chunk_rows):
+            stop = min(start + chunk_rows, rows)
+            read_start = time.perf_counter()
+            block = reader[start:stop]
+            decode_start = time.perf_counter()
+            decode_block(block, out[start:stop])
+            read_time += decode_start - read_start
+            decode_time += time.perf_counter() - decode_start
+            yield stop
+    finally:
+        stage_timer.record('read', read_time)
+        stage_timer.record('decode', decode_time)
+
+
+def decode_dataset(ds, chunk_rows: int = DEFAULT_CHUNK_ROWS, task=None):
+    """Decodes a whole h5py dataset. Returns (headers, float64 2D array)
+    task (optional, see background_task.TaskWorker) receives progress
+    after every block and may cancel the decoding between blocks."""
+    headers = get_headers(ds.dtype, ds.shape)
+    out = np.empty(shape=(ds.shape[0], len(headers)), dtype='float64')
+    for done in iter_decode_dataset(ds, out, chunk_rows):
+        if task:
+            task.check_cancelled()
+            task.report_progress(done, ds.shape[0])
+    return headers, out
+
+
+def get_first_dataset_name(f) -> str:
+    """Path of the first dataset of the file, looking into groups as well"""
+    name = f.visititems(lambda path, obj: path if isinstance(obj, h5py.Dataset) else None)
+    if name is None:
+        raise Exception("В файле нет наборов данных")
+    return name
+
+
+def load_h5(path: str, dataset_name: str = None, chunk_rows: int = DEFAULT_CHUNK_ROWS, task=None):
+    """Opens an h5 file and decodes one dataset (the first one by default).
+    Returns (headers, float64 2D array) with the values as stored in the file."""
+    with h5py.File(path, "r") as f:
+        if dataset_name is None:
+            dataset_name = get_first_dataset_name(f)
+        return decode_dataset(f[dataset_name], chunk_rows, task)
+
+
+def load_h5_datasets(path: str, dataset_names: list, chunk_rows: int = DEFAULT_CHUNK_ROWS, task=None):
+    """Decodes several datasets with the same row count side by side.
+    Column headers are prefixed with the dataset name when there are several of them."""
+    if len(dataset_names) == 1:
+        return load_h5(path, dataset_names[0], chunk_rows, task)
+
+    with h5py.File(path, "r") as f:
+        datasets = [f[name] for name in dataset_names]
+        rows = datasets[0].shape[0]
+        if any(ds.shape[0] != rows for ds in datasets):
+            raise Exception("Наборы данных имеют разное количество строк")
+
+        headers = {}
+        widths = []
+        for name, ds in zip(dataset_names, datasets):
+            ds_headers = get_headers(ds.dtype, ds.shape)
+            widths.append(len(ds_headers))
+            for header in ds_headers.values():
+                headers[len(headers)] = f"{name.strip('/')}/{header}"
+
+        data = np.empty(shape=(rows, len(headers)), dtype='float64')
+        col = 0
+        for idx, (ds, width) in enumerate(zip(datasets, widths)):
+            for done in iter_decode_dataset(ds, data[:, col:col + width], chunk_rows):
+                if task:
+                    task.check_cancelled()
+                    task.report_progress(idx * rows + done, len(datasets) * rows)
+            col += width
+
+    return headers, data
+
+
+def describe_h5_object(obj) -> dict:
+    """Metadata of a group or dataset read from the file headers only, no data is touched"""
+    if isinstance(obj, h5py.Group):
+        return {"kind": "group", "size": f"{len(obj)} items", "dtype": "", "chunks": "", "compression": ""}
+
+    if obj.dtype.names:
+        dtype = ", ".join(f"{name}: {obj.dtype.fields[name][0]}" for name in obj.dtype.names)
+    else:
+        dtype = str(obj.dtype)
+    return {
+        "kind": "dataset",
+        "size": " x ".join(str(dim) for dim in obj.shape),
+        "dtype": dtype,
+        "chunks": " x ".join(str(dim) for dim in obj.chunks) if obj.chunks else "contiguous",
+        "compression": obj.compression or "",
+    }
+
+
+if __name__ == '__main__':
+    # python h5_loader.py <file.h5> [dataset] - замер времени загрузки без GUI
+    start_time = time.perf_counter()
+    _headers, _data = load_h5(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"{_data.shape[0]} rows x {_data.shape[1]} cols: {time.perf_counter() - start_time:.3f} s")
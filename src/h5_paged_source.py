@@ -0,0 +1,109 @@
+from collections import OrderedDict
+
+import h5py
+import numpy as np
+
+from h5_loader import get_headers, get_column_dtypes, get_first_dataset_name, decode_block, get_reader
+
+
+# Строк в одной странице и число страниц в кэше: память ~ PAGE_ROWS * MAX_PAGES * cols * 8 байт
+DEFAULT_PAGE_ROWS = 4096
+DEFAULT_MAX_PAGES = 64
+# Сколько строк максимум отдаём на график в ленивом режиме
+DEFAULT_OVERVIEW_ROWS = 200_000
+
+
+class H5PagedSource:
+    """Keeps an h5 dataset open and serves decoded float64 rows from an LRU cache
+    of fixed-size pages read on demand."""
+
+    def __init__(self, path: str, dataset_name: str = None,
+                 page_rows: int = DEFAULT_PAGE_ROWS, max_pages: int = DEFAULT_MAX_PAGES):
+        self._file = h5py.File(path, "r")
+        if dataset_name is None:
+            dataset_name = get_first_dataset_name(self._file)
+        self._ds = self._file[dataset_name]
+        # np.memmap для непрерывных несжатых данных, иначе сам h5py dataset
+        self._reader = get_reader(self._ds)
+
+        self.path = path
+        self.dataset_name = dataset_name
+        self.page_rows = page_rows
+        self.max_pages = max_pages
+
+        self._headers = get_headers(self._ds.dtype, self._ds.shape)
+        self._pages = OrderedDict()
+        self._overview = None
+        self._overview_step = 1
+
+    @property
+    def shape(self) -> tuple:
+        return self._ds.shape[0], len(self._headers)
+
+    def get_headers(self) -> dict:
+        return self._headers
+
+    def get_column_dtypes(self) -> list:
+        return get_column_dtypes(self._ds.dtype, self._ds.shape)
+
+    def close(self):
+        self._pages.clear()
+        self._overview = None
+        self._reader = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _decode(self, block: np.ndarray) -> np.ndarray:
+        return decode_block(block)
+
+    def get_page(self, page_idx: int) -> np.ndarray:
+        page = self._pages.get(page_idx)
+        if page is not None:
+            self._pages.move_to_end(page_idx)
+            return page
+
+        start = page_idx * self.page_rows
+        stop = min(start + self.page_rows, self.shape[0])
+        page = self._decode(self._reader[start:stop])
+
+        self._pages[page_idx] = page
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def get_row(self, row: int) -> np.ndarray:
+        return self.get_page(row // self.page_rows)[row % self.page_rows]
+
+    def get_value(self, row: int, col: int):
+        return self.get_row(row)[col]
+
+    def get_rows(self, start: int, stop: int) -> np.ndarray:
+        """Rows [start, stop) read directly, bypassing the page cache"""
+        return self._decode(self._reader[start:min(stop, self.shape[0])])
+
+    def iter_pages(self, block_rows: int = None):
+        """Iterates over all rows in blocks (a page by default) without filling the cache"""
+        block_rows = block_rows or self.page_rows
+        rows = self.shape[0]
+        for start in range(0, rows, block_rows):
+            yield start, self._decode(self._reader[start:min(start + block_rows, rows)])
+
+    def get_overview(self, max_rows: int = DEFAULT_OVERVIEW_ROWS) -> np.ndarray:
+        """Every n-th row of the dataset, at most max_rows rows, for plotting"""
+        if self._overview is None:
+            step = max(1, -(-self.shape[0] // max_rows))
+            self._overview = self._decode(self._reader[::step])
+            self._overview_step = step
+        return self._overview
+
+    def x_to_rows(self, xmin: np.ndarray, xmax: np.ndarray) -> tuple:
+        """Row ranges [start, stop) holding all rows with xmin <= x <= xmax, found on the
+        overview: they may take up to one overview step more rows on each side"""
+        x = self.get_overview()[:, 0]
+        step = self._overview_step
+        before = np.searchsorted(x, xmin, side='left')
+        after = np.searchsorted(x, xmax, side='right')
+        starts = np.maximum(before - 1, 0) * step
+        stops = np.minimum(after * step, self.shape[0])
+        return starts, stops
@@ -1,25 +1,37 @@
+import functools
 import random
 import sys
-import h5py
-import numpy as np
-from PyQt6 import QtWidgets, QtGui
+from PyQt6 import QtWidgets, QtGui, QtCore
 
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-import matplotlib
+from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 
 from ui.main_window import Ui_MainWindow
 from edit_settings import SettingsEditDialog
 from edit_mark import MarkEditDialog
+from filters_dialog import FiltersDialog
+from detect_events_dialog import DetectEventsDialog
+from spectrum_view import SpectrumView
+from mark_stats_view import MarkStatsView
 from mark import Mark
 from table_marks_model import TableMarksModel
+from table_mark_stats_model import TableMarkStatsModel
 from table_data_model import TableDataModel
 from plot_model import MyPlot, GraphTypes
-
-
-matplotlib.use('QT5Agg')
+from background_task import TaskWorker
+from csv_exporter import export_csv, EXPORT_CHUNK_ROWS
+from timing import stage_timer, get_profile_path, start_profiler
+from signal_filter import FilteredSignal, estimate_sample_rate
+from spectral import compute_spectrum, get_spectrum_key
+from event_detection import detect_events
+from mark_stats import compute_interval_stats_rows
+# модули, которым нужен h5py, импортируются при первом открытии или сохранении файла,
+# чтобы окно появлялось быстрее
 
 
 class MainApp(QtWidgets.QMainWindow):
+    # длительности этапов приходят из рабочих потоков, поэтому через сигнал
+    stage_timed = QtCore.pyqtSignal(str, float)
+
     def __init__(self):
         super().__init__()
         self.ui = Ui_MainWindow()
@@ -28,22 +40,47 @@ class MainApp(QtWidgets.QMainWindow):
         self.csv_delimiter = ';'
         self._csv_accuracy = 4
         self._selected_graph_type: GraphTypes = GraphTypes.plot
+        # сохранять пирамиду графика рядом с исходным файлом (включается в настройках)
+        self._pyramid_sidecar = False
+        # сохранять метки в атрибут набора данных исходного файла, а не в файл рядом (включается в настройках)
+        self._marks_in_source = False
+        self._current_file = None
+        self._current_dataset = None
+        # режим слежения за записываемым файлом
+        self._follower = None
+        self._follow_timer = QtCore.QTimer(self)
+        self._follow_timer.timeout.connect(self.on_follow_timer)
 
         self.verticalLayout_1 = QtWidgets.QVBoxLayout(self.ui.plotFrame)
         self.verticalLayout_1.setObjectName("horizontalLayout_1")
 
         self._my_plot = MyPlot()
+        self._table_data = TableDataModel()
+        self._table_data.set_accuracy(self._csv_accuracy)
+        self._my_plot.set_row_reader(self._table_data.get_rows)
+        self._filtered = FilteredSignal()
+        self._my_plot.set_filter(self._filtered)
         self.verticalLayout_1.addWidget(NavigationToolbar(self._my_plot.get_canvas(), self))
         self.verticalLayout_1.addWidget(self._my_plot.get_canvas())
 
         self.ui.menuActionOpen_h5.triggered.connect(self.on_btnOpenH5File_click)
+        self.ui.menuActionOpen_h5_lazy.triggered.connect(self.on_btnOpenH5FileLazy_click)
+        self.ui.menuActionOpen_h5_browse.triggered.connect(self.on_btnOpenH5FileBrowse_click)
+        self.ui.menuActionFollow_h5.triggered.connect(self.on_btnFollowH5File_click)
         self.ui.menuActionSave_csv.triggered.connect(self.on_btnSaveCvsFile_click)
+        self.ui.menuActionSave_binary.triggered.connect(self.on_btnSaveBinaryFile_click)
+        self.ui.menuActionSave_marks.triggered.connect(self.on_btnSaveMarks_click)
+        self.ui.menuActionLoad_marks.triggered.connect(self.on_btnLoadMarks_click)
+        self.ui.menuActionDetectEvents.triggered.connect(self.on_btnDetectEvents_click)
         self.ui.menuActionEditSettings.triggered.connect(self.on_btnEditSettings_click)
+        self.ui.menuActionTimings.triggered.connect(self.on_btnTimings_click)
+        self.ui.menuActionFilters.triggered.connect(self.on_btnFilters_click)
+        self.ui.menuActionSpectrum.triggered.connect(self.on_btnSpectrum_click)
+        self.ui.menuActionMarkStats.triggered.connect(self.on_btnMarkStats_click)
         self.ui.btnAddMark.clicked.connect(self.on_btnAddMark_click)
         self.ui.btnEditMark.clicked.connect(self.on_btnEditMark_click)
         self.ui.btnDeleteMark.clicked.connect(self.on_btnDeleteMark_click)
 
-        self._table_data = TableDataModel()
         self.ui.tableViewData.setModel(self._table_data)
         self.ui.tableViewData.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
 
@@ -51,6 +88,49 @@ class MainApp(QtWidgets.QMainWindow):
         self.ui.tableViewMarks.setModel(self._table_marks)
         self.ui.tableViewMarks.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
 
+        self._task: TaskWorker | None = None
+        self._task_progress = QtWidgets.QProgressBar()
+        self._task_progress.setMaximumWidth(200)
+        self._task_progress.setRange(0, 1000)
+        self._task_cancel = QtWidgets.QPushButton("Отмена")
+        self._task_cancel.clicked.connect(self.on_btnCancelTask_click)
+        self.statusBar().addPermanentWidget(self._task_progress)
+        self.statusBar().addPermanentWidget(self._task_cancel)
+        self._task_progress.hide()
+        self._task_cancel.hide()
+
+        self._timing_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self._timing_label)
+        self._timings_table = QtWidgets.QTableWidget(0, 4)
+        self._timings_table.setHorizontalHeaderLabels(["Этап", "Последний, мс", "Средний, мс", "Раз"])
+        self._timings_table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
+        self._timings_dock = QtWidgets.QDockWidget("Timings", self)
+        self._timings_dock.setWidget(self._timings_table)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.BottomDockWidgetArea, self._timings_dock)
+        self._timings_dock.hide()
+        self.stage_timed.connect(self.on_stage_timed)
+
+        # спектры по get_spectrum_key, сбрасываются при смене данных
+        self._spectra = {}
+        self._spectrum_view = SpectrumView()
+        self._spectrum_view.compute_requested.connect(self.on_spectrum_requested)
+        self._spectrum_dock = QtWidgets.QDockWidget("Spectrum", self)
+        self._spectrum_dock.setWidget(self._spectrum_view)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.RightDockWidgetArea, self._spectrum_dock)
+        self._spectrum_dock.hide()
+
+        # статистика меток считается, только пока панель открыта
+        self._mark_stats = TableMarkStatsModel()
+        self._mark_stats_view = MarkStatsView(self._mark_stats)
+        self._mark_stats_dock = QtWidgets.QDockWidget("Mark statistics", self)
+        self._mark_stats_dock.setWidget(self._mark_stats_view)
+        self.addDockWidget(QtCore.Qt.DockWidgetArea.BottomDockWidgetArea, self._mark_stats_dock)
+        self._mark_stats_dock.hide()
+        # в ленивом режиме статистика считается в фоне; запрос во время другой задачи откладывается
+        self._mark_stats_pending = False
+        self._mark_stats_generation = 0
+        stage_timer.add_listener(self.stage_timed.emit)
+
         graph_types = [dt.value for dt in GraphTypes]
         self.ui.comboBoxScatterPlot.addItems(graph_types)
         self.ui.comboBoxScatterPlot.currentIndexChanged.connect(self.onChangedComboBoxScatterPlot)
@@ -58,9 +138,99 @@ class MainApp(QtWidgets.QMainWindow):
         self.draw_graphic()
 
     def update_app(self):
+        self.reset_filtered()
+        self._spectra.clear()
+        self._spectrum_view.set_channels(self._table_data.get_headers())
+        self._mark_stats_view.set_channels(self._table_data.get_headers())
         self._table_marks.delete_marks()
+        self.load_saved_marks()
+        self.update_mark_stats()
         self.draw_graphic()
 
+    def reset_filtered(self):
+        rows = self._table_data.rowCount()
+        sample_rate = estimate_sample_rate(self._table_data.get_rows(0, min(rows, 10000))[:, 0]) if rows else None
+        self._filtered.reset(self._table_data.get_rows, rows, sample_rate)
+
+    def get_export_blocks(self):
+        """Rows for export: filtered if filters are on (with an own cache, the export runs in a worker)"""
+        if self._filtered.is_active():
+            return self._filtered.copy().iter_blocks(EXPORT_CHUNK_ROWS)
+        return self._table_data.iter_blocks(EXPORT_CHUNK_ROWS)
+
+    def set_current_file(self, path: str, dataset_name: str = None):
+        self._current_file = path
+        self._current_dataset = dataset_name
+
+    def apply_marks(self, marks: list):
+        """Replaces all marks: one model reset, one row assignment, one span layer update"""
+        self._table_marks.set_marks(marks)
+        self._table_data.update_marked_rows(self._table_marks.get_index())
+        self._my_plot.update_plot(self._table_marks.get_marks())
+        self.update_mark_stats()
+
+    def update_mark_stats(self):
+        """Statistics of all marks anew"""
+        if not self._mark_stats_dock.isVisible():
+            return
+        if self._table_data.is_paged():
+            self._mark_stats_generation += 1
+            self._mark_stats.clear(self._table_data.columnCount() - 1)
+            self.start_mark_stats_task()
+        else:
+            self._mark_stats.set_data(self._table_data.get_data(), self._table_marks.get_index())
+
+    def sync_mark_stats(self):
+        """Statistics only of the added or edited marks"""
+        if not self._mark_stats_dock.isVisible():
+            return
+        if self._table_data.is_paged():
+            self.start_mark_stats_task()
+        else:
+            self._mark_stats.sync(self._table_marks.get_index())
+
+    def start_mark_stats_task(self):
+        """Lazy mode: statistics of the pending marks over all their rows, read from the file in a worker"""
+        if self._task is not None:
+            self._mark_stats_pending = True
+            return
+        mark_index = self._table_marks.get_index().copy()
+        positions = self._mark_stats.get_pending(mark_index)
+        xmin = mark_index.xmin[positions]
+        xmax = mark_index.xmax[positions]
+        starts, stops = self._table_data.x_to_rows(xmin, xmax)
+        channels = self._table_data.columnCount() - 1
+        if not positions.size:
+            # метки только удалены: читать нечего
+            self._mark_stats.merge(mark_index, positions, compute_interval_stats_rows(
+                self._table_data.get_rows, starts, stops, xmin, xmax, channels))
+            return
+        self.run_task(TaskWorker(compute_interval_stats_rows, self._table_data.get_rows, starts, stops,
+                                 xmin, xmax, channels),
+                      "Статистика меток",
+                      functools.partial(self.on_mark_stats_computed, mark_index=mark_index, positions=positions,
+                                        generation=self._mark_stats_generation))
+
+    def on_mark_stats_computed(self, stats, mark_index=None, positions=None, generation: int = 0):
+        # данные сменились, пока шёл подсчёт
+        if generation != self._mark_stats_generation:
+            return
+        self._mark_stats.merge(mark_index, positions, stats)
+        # метки изменились, пока шёл подсчёт
+        if self._mark_stats.get_pending(self._table_marks.get_index()).size:
+            self._mark_stats_pending = True
+
+    def load_saved_marks(self):
+        if not self._current_file:
+            return
+        try:
+            from marks_storage import load_marks
+            records = load_marks(self._current_file, self._current_dataset)
+            if records is not None:
+                self.apply_marks(Mark.from_records(records))
+        except Exception as ex:
+            self.statusBar().showMessage("Не удалось загрузить метки: " + str(ex), 10000)
+
     def draw_graphic(self):
         try:
             data = self._table_data.get_data()
@@ -76,59 +246,363 @@ class MainApp(QtWidgets.QMainWindow):
         file = QtWidgets.QFileDialog.getOpenFileName(self, "Выберите файл", filter="h5 (*.h5);;hdf5  (*.hdf5)")
 
         if file and file[0]:
-            with h5py.File(file[0], "r") as f:
-                a_group_key = list(f.keys())[0]
+            from session_loader import load_h5_session
+            self.run_task(TaskWorker(load_h5_session, file[0], use_sidecar=self._pyramid_sidecar),
+                          "Загрузка " + file[0], functools.partial(self.on_h5_loaded, path=file[0]))
+
+    def on_h5_loaded(self, result, path: str = None, dataset_name: str = None):
+        headers, data, pyramid, column_dtypes = result
+        self.stop_follow()
+        self.set_current_file(path, dataset_name)
+        self._table_data.set_headers(headers)
+        self._table_data.set_items(data, column_dtypes)
+        self._my_plot.set_pyramid(pyramid)
+
+        self.update_app()
+
+    def open_lazy_source(self, path: str, dataset_name: str = None):
+        from h5_paged_source import H5PagedSource
+        from session_loader import build_source_pyramid
+        # фоновая задача работает с текущими данными, их нельзя подменять до её завершения
+        if self._task is not None:
+            raise Exception("Дождитесь завершения текущей задачи")
+        source = H5PagedSource(path, dataset_name)
+        self.stop_follow()
+        self.set_current_file(path, source.dataset_name)
+        self._table_data.set_source(source)
+        self._my_plot.set_pyramid(None)
+
+        # пока строится пирамида, на графике прореженные строки;
+        # задача запускается до update_app, остальные (статистика меток) ждут её
+        self.run_task(TaskWorker(build_source_pyramid, path, source.dataset_name, use_sidecar=self._pyramid_sidecar),
+                      "Построение графика " + path, self.on_pyramid_built)
+        self.update_app()
+
+    def on_pyramid_built(self, pyramid):
+        self._my_plot.set_pyramid(pyramid)
+        self.draw_graphic()
+
+    def start_follow(self, path: str, dataset_name: str = None):
+        from h5_follower import H5Follower, FOLLOW_POLL_MS
+        from plot_pyramid import MinMaxPyramid
+        if self._task is not None:
+            raise Exception("Дождитесь завершения текущей задачи")
+        self.stop_follow()
+        follower = H5Follower(path, dataset_name)
+        data = follower.read_new()
+        if data is None:
+            follower.close()
+            raise Exception("Набор данных пуст")
+
+        self._follower = follower
+        self.set_current_file(path, follower.dataset_name)
+        self._table_data.set_headers(follower.get_headers())
+        self._table_data.set_items(data, follower.get_column_dtypes())
+        self._my_plot.set_pyramid(MinMaxPyramid.build(data))
+        self.update_app()
+
+        self.ui.menuActionFollow_h5.setChecked(True)
+        self._follow_timer.start(FOLLOW_POLL_MS)
+        self.statusBar().showMessage("Слежение за " + path + (" (SWMR)" if follower.swmr else ""), 5000)
+
+    def stop_follow(self):
+        self._follow_timer.stop()
+        self.ui.menuActionFollow_h5.setChecked(False)
+        if self._follower:
+            self._follower.close()
+            self._follower = None
+
+    def on_follow_timer(self):
+        try:
+            block = self._follower.read_new()
+        except Exception as ex:
+            self.stop_follow()
+            QtWidgets.QMessageBox.about(self, "Ошибка чтения файла: ", str(ex))
+            return
+        if block is None:
+            return
+        self._table_data.append_items(block)
+        self._filtered.set_rows(self._table_data.rowCount())
+        self._spectra.clear()
+        self.update_mark_stats()
+        if not self._my_plot.append_data(self._table_data.get_data(), block):
+            self.draw_graphic()
+
+    def on_btnFollowH5File_click(self, checked: bool):
+        if not checked:
+            self.stop_follow()
+            return
+
+        file = QtWidgets.QFileDialog.getOpenFileName(self, "Выберите файл", filter="h5 (*.h5);;hdf5  (*.hdf5)")
+        if file and file[0]:
+            try:
+                self.start_follow(file[0])
+                return
+            except Exception as ex:
+                QtWidgets.QMessageBox.about(self, "Ошибка открытия файла: ", str(ex))
+        self.ui.menuActionFollow_h5.setChecked(False)
+
+    def run_task(self, task: TaskWorker, title: str, on_result):
+        if self._task is not None:
+            QtWidgets.QMessageBox.about(self, "Фоновая задача", "Дождитесь завершения текущей задачи")
+            return
+
+        self._task = task
+        self._task_title = title
+        task.progress.connect(self.on_task_progress)
+        task.result_ready.connect(on_result)
+        task.failed.connect(self.on_task_failed)
+        task.cancelled.connect(self.on_task_cancelled)
+        task.finished.connect(self.on_task_finished)
+
+        self._task_progress.setValue(0)
+        self._task_progress.show()
+        self._task_cancel.show()
+        self.statusBar().showMessage(title)
+        task.start()
+
+    def on_task_progress(self, done, total):
+        if total:
+            self._task_progress.setValue(int(1000 * done / total))
+
+    def on_task_failed(self, message):
+        QtWidgets.QMessageBox.about(self, "Ошибка: ", self._task_title + "\n" + message)
+
+    def on_task_cancelled(self):
+        self.statusBar().showMessage(self._task_title + ": отменено", 5000)
+
+    def on_task_finished(self):
+        self._task_progress.hide()
+        self._task_cancel.hide()
+        if self.statusBar().currentMessage() == self._task_title:
+            self.statusBar().clearMessage()
+        self._task.deleteLater()
+        self._task = None
+        if self._mark_stats_pending:
+            self._mark_stats_pending = False
+            self.sync_mark_stats()
+
+    def on_stage_timed(self, name: str, seconds: float):
+        self._timing_label.setText(f"{name}: {seconds * 1000:.1f} ms")
+        if self._timings_dock.isVisible():
+            self.update_timings_table()
+
+    def update_timings_table(self):
+        stages = stage_timer.get_stages()
+        self._timings_table.setRowCount(len(stages))
+        for row, (name, last, mean, count) in enumerate(stages):
+            for col, value in enumerate((name, f"{last * 1000:.1f}", f"{mean * 1000:.1f}", str(count))):
+                self._timings_table.setItem(row, col, QtWidgets.QTableWidgetItem(value))
+
+    def on_btnTimings_click(self):
+        self.update_timings_table()
+        self._timings_dock.show()
+
+    def on_btnCancelTask_click(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def on_btnOpenH5FileLazy_click(self):
+        file = QtWidgets.QFileDialog.getOpenFileName(self, "Выберите файл", filter="h5 (*.h5);;hdf5  (*.hdf5)")
+
+        if file and file[0]:
+            try:
+                self.open_lazy_source(file[0])
+            except Exception as ex:
+                QtWidgets.QMessageBox.about(self, "Ошибка открытия файла: ", str(ex))
 
-                ds_arr = np.array(f[a_group_key][:])
-                names = ds_arr.dtype.names
-                dict_names = {k: v for k, v in enumerate(names)}
+    def on_btnOpenH5FileBrowse_click(self):
+        file = QtWidgets.QFileDialog.getOpenFileName(self, "Выберите файл", filter="h5 (*.h5);;hdf5  (*.hdf5)")
 
-                rows = ds_arr.shape[0]
-                cols = len(names)
-                float_arr = np.empty(shape=(rows, cols))
+        if file and file[0]:
+            try:
+                from h5_browser import H5BrowserDialog
+                from session_loader import load_h5_session
+                dialog = H5BrowserDialog(file[0])
+                result = dialog.exec()
+                if result == 0:
+                    return
 
-                for i in range(rows):
-                    arr = np.asarray(list(map(float, ds_arr[i])), dtype='float64')
-                    float_arr[i] = arr
+                data = dialog.get_data()
+                if not data['datasets']:
+                    raise Exception("Не выбран ни один набор данных")
 
-                res_arr = np.around(float_arr, self._csv_accuracy)
-                self._table_data.set_headers(dict_names)
-                self._table_data.set_items(res_arr)
+                if data['lazy']:
+                    if len(data['datasets']) > 1:
+                        raise Exception("В ленивом режиме можно открыть только один набор данных")
+                    self.open_lazy_source(file[0], data['datasets'][0])
+                    return
 
-                self.update_app()
+                self.run_task(TaskWorker(load_h5_session, file[0], data['datasets'], use_sidecar=self._pyramid_sidecar),
+                              "Загрузка " + file[0],
+                              functools.partial(self.on_h5_loaded, path=file[0], dataset_name=data['datasets'][0]))
+            except Exception as ex:
+                QtWidgets.QMessageBox.about(self, "Ошибка открытия файла: ", str(ex))
 
     def on_btnSaveCvsFile_click(self):
         try:
             file = QtWidgets.QFileDialog.getSaveFileName(self, 'Сохранить файл', 'data', "csv (*.csv)")
             if file and file[0]:
-                res_data = self._table_data.get_marked_data_for_save()
-
-                names = list(self._table_data.get_headers().values())
-                names.append('mark color')
-                np.savetxt(file[0], names, newline=self.csv_delimiter, fmt="%s")
-                with open(file[0], 'ab') as f:
-                    np.savetxt(f, [''], delimiter=self.csv_delimiter, fmt="%s")
-                    np.savetxt(f, res_data, delimiter=self.csv_delimiter, fmt="%s")
-                QtWidgets.QMessageBox.about(self, "Save csv", "Данные успешно сохранены в файл: " + file[0])
+                self.run_task(TaskWorker(export_csv, file[0],
+                                         self.get_export_blocks(),
+                                         self._table_data.rowCount(),
+                                         self._table_data.get_headers(),
+                                         self._table_marks.get_index().copy(),
+                                         delimiter=self.csv_delimiter,
+                                         accuracy=self._table_data.get_accuracy()),
+                              "Сохранение " + file[0], functools.partial(self.on_file_saved, file_format='csv'))
             else:
                 raise Exception("Данные не сохранены в файл")
         except Exception as ex:
             QtWidgets.QMessageBox.about(self, "Ошибка сохранения в файл: ", str(ex))
 
+    def on_btnSaveBinaryFile_click(self):
+        try:
+            file = QtWidgets.QFileDialog.getSaveFileName(self, 'Сохранить файл', 'data',
+                                                         "h5 (*.h5);;npy (*.npy);;parquet (*.parquet)")
+            if file and file[0]:
+                from binary_exporter import export_binary, EXPORT_FORMATS
+                path = file[0]
+                if not path.lower().endswith(EXPORT_FORMATS):
+                    path += '.' + file[1].split(' ')[0]
+                self.run_task(TaskWorker(export_binary, path,
+                                         self.get_export_blocks(),
+                                         self._table_data.rowCount(),
+                                         self._table_data.get_headers(),
+                                         self._table_data.get_column_dtypes(),
+                                         self._table_marks.get_index().copy()),
+                              "Сохранение " + path,
+                              functools.partial(self.on_file_saved, file_format=path.rsplit('.', 1)[-1].lower()))
+            else:
+                raise Exception("Данные не сохранены в файл")
+        except Exception as ex:
+            QtWidgets.QMessageBox.about(self, "Ошибка сохранения в файл: ", str(ex))
+
+    def on_btnSaveMarks_click(self):
+        try:
+            if not self._current_file:
+                raise Exception("Файл не открыт")
+            from marks_storage import save_marks, marks_to_array
+            path, error = save_marks(self._current_file, self._current_dataset,
+                                     marks_to_array(self._table_marks.get_index()), self._marks_in_source)
+            if error:
+                self.statusBar().showMessage("Не удалось сохранить метки в исходный файл (" + error +
+                                             "), сохранены: " + path, 10000)
+            else:
+                self.statusBar().showMessage("Метки сохранены: " + path, 5000)
+        except Exception as ex:
+            QtWidgets.QMessageBox.about(self, "Ошибка сохранения меток: ", str(ex))
+
+    def on_btnLoadMarks_click(self):
+        try:
+            file = QtWidgets.QFileDialog.getOpenFileName(self, "Выберите файл меток", filter="h5 (*.h5);;hdf5  (*.hdf5)")
+            if file and file[0]:
+                from marks_storage import read_marks_array
+                self.apply_marks(Mark.from_records(read_marks_array(file[0])))
+        except Exception as ex:
+            QtWidgets.QMessageBox.about(self, "Ошибка загрузки меток: ", str(ex))
+
+    def on_btnDetectEvents_click(self):
+        try:
+            dialog = DetectEventsDialog(self._table_data.get_headers())
+            if dialog.exec() == 0:
+                return
+            data = dialog.get_data()
+            # поиск идёт по всем строкам, в ленивом режиме - кусками из файла
+            reader = self._filtered.copy().get_rows if self._filtered.is_active() else self._table_data.get_rows
+            self.run_task(TaskWorker(detect_events, reader, self._table_data.rowCount(), data['channel'],
+                                     data['rule'], data['threshold'], data['below'], data['window'],
+                                     data['merge_gap'], data['min_duration']),
+                          "Поиск событий", self.on_events_detected)
+        except Exception as ex:
+            QtWidgets.QMessageBox.about(self, "Ошибка поиска событий: ", str(ex))
+
+    def on_events_detected(self, result):
+        """Adds the found intervals that do not overlap existing marks, all in one update"""
+        xmin, xmax = result
+        index = self._table_marks.get_index()
+        free = ~index.collisions(xmin, xmax)
+        color = QtGui.QColor(255, 0, 0)
+        color.setAlphaF(Mark.get_alpha())
+        marks = [Mark(xmin=a, xmax=b, color=color) for a, b in zip(xmin[free].tolist(), xmax[free].tolist())]
+        if marks:
+            self.apply_marks(list(index.marks) + marks)
+        self.statusBar().showMessage(f"Найдено событий: {xmin.shape[0]}, добавлено меток: {len(marks)}", 5000)
+
+    def on_file_saved(self, path, file_format: str = 'csv'):
+        QtWidgets.QMessageBox.about(self, "Save " + file_format, "Данные успешно сохранены в файл: " + path)
+
+    def on_btnFilters_click(self):
+        try:
+            dialog = FiltersDialog(self._table_data.get_headers(), self._filtered.get_chains(),
+                                   self._filtered.sample_rate)
+            if dialog.exec() == 0:
+                return
+            data = dialog.get_data()
+            channels = [data['channel']] if data['channel'] else range(1, self._table_data.columnCount())
+            for channel in channels:
+                self._filtered.set_chain(channel, data['chain'])
+            if self._filtered.is_active() and self._task is None:
+                # огибающая всего сигнала считается в фоне, иначе первый общий вид фильтрует весь файл
+                self.run_task(TaskWorker(self._filtered.copy().build_envelopes), "Фильтрация",
+                              self.on_filter_envelopes_built)
+            else:
+                self.draw_graphic()
+        except Exception as ex:
+            QtWidgets.QMessageBox.about(self, "Ошибка настройки фильтров: ", str(ex))
+
+    def on_filter_envelopes_built(self, envelopes):
+        self._filtered.add_envelopes(envelopes)
+        self.draw_graphic()
+
+    def on_btnSpectrum_click(self):
+        self._spectrum_view.set_channels(self._table_data.get_headers())
+        self._spectrum_dock.show()
+
+    def on_spectrum_requested(self, channel: int, nperseg: int, noverlap: int):
+        try:
+            if not self._filtered.sample_rate:
+                raise Exception("Частота дискретизации неизвестна")
+            chain = self._filtered.get_chains().get(channel) if self._filtered.is_active() else None
+            key = get_spectrum_key(channel, nperseg, noverlap, chain.key() if chain else None)
+            title = self._table_data.get_headers().get(channel, str(channel))
+            if key in self._spectra:
+                self._spectrum_view.show_spectrum(self._spectra[key], title)
+                return
+
+            # отфильтрованные строки читаются через свою копию кэша фильтров
+            reader = self._filtered.copy().get_rows if chain else self._table_data.get_rows
+            self.run_task(TaskWorker(compute_spectrum, reader, self._table_data.rowCount(), channel,
+                                     self._filtered.sample_rate, nperseg, noverlap),
+                          "Спектр " + title, functools.partial(self.on_spectrum_computed, key=key, title=title))
+        except Exception as ex:
+            QtWidgets.QMessageBox.about(self, "Ошибка вычисления спектра: ", str(ex))
+
+    def on_spectrum_computed(self, spectrum, key: tuple = None, title: str = ""):
+        self._spectra[key] = spectrum
+        self._spectrum_view.show_spectrum(spectrum, title)
+
+    def on_btnMarkStats_click(self):
+        self._mark_stats_view.set_channels(self._table_data.get_headers())
+        self._mark_stats_dock.show()
+        self.update_mark_stats()
+
     def on_btnEditSettings_click(self):
-        dialog = SettingsEditDialog(self.csv_delimiter, self._csv_accuracy)
+        dialog = SettingsEditDialog(self.csv_delimiter, self._csv_accuracy, self._pyramid_sidecar, self._marks_in_source)
         result = dialog.exec()
         if result == 0:
             return
 
         data = dialog.get_data()
+        self._pyramid_sidecar = data['pyramid_sidecar']
+        self._marks_in_source = data['marks_in_source']
         if data['csv_delimiter']:
             self.csv_delimiter = data['csv_delimiter']
 
         if data['csv_accuracy']:
             try:
                 self._csv_accuracy = int(float(data['csv_accuracy']))
-                self._table_data.around_data(self._csv_accuracy)
+                self._table_data.set_accuracy(self._csv_accuracy)
             except:
                 pass
 
@@ -156,11 +630,9 @@ class MainApp(QtWidgets.QMainWindow):
                 self._my_plot.clear_xmin_xmax()
 
                 self._table_marks.add_mark(mark)
-                self._table_data.update_marked_rows(self._table_marks.get_marks())
-                self._my_plot.draw_plot(data=self._table_data.get_data(),
-                                        headers=self._table_data.get_headers(),
-                                        marks=self._table_marks.get_marks(),
-                                        graph_type=self._selected_graph_type)
+                self._table_data.update_marked_rows(self._table_marks.get_index())
+                self._my_plot.add_mark(mark)
+                self.sync_mark_stats()
 
         except Exception as ex:
             QtWidgets.QMessageBox.about(self, "Ошибка добавления метки: ", str(ex))
@@ -183,8 +655,10 @@ class MainApp(QtWidgets.QMainWindow):
             if edited_mark.color:
                 mark.color = edited_mark.color
 
-            self._my_plot.update_plot(marks=self._table_marks.get_marks())
-            self._table_data.update_marked_rows(self._table_marks.get_marks())
+            self._table_marks.update_mark(mark)
+            self._my_plot.update_mark(mark)
+            self._table_data.update_marked_rows(self._table_marks.get_index())
+            self.sync_mark_stats()
 
         except Exception as ex:
             QtWidgets.QMessageBox.about(self, "Ошибка мзменения метки: ", str(ex))
@@ -193,12 +667,11 @@ class MainApp(QtWidgets.QMainWindow):
         try:
             item = self.ui.tableViewMarks.currentIndex()
             if item.isValid():
+                mark = self._table_marks.get_mark(item.row())
                 self._table_marks.delete_mark(item)
-                self._table_data.update_marked_rows(self._table_marks.get_marks())
-                self._my_plot.draw_plot(data=self._table_data.get_data(),
-                                        headers=self._table_data.get_headers(),
-                                        marks=self._table_marks.get_marks(),
-                                        graph_type=self._selected_graph_type)
+                self._table_data.update_marked_rows(self._table_marks.get_index())
+                self._my_plot.remove_mark(mark)
+                self.sync_mark_stats()
         except Exception as ex:
             QtWidgets.QMessageBox.about(self, "Ошибка удаления метки: ", str(ex))
 
@@ -215,11 +688,19 @@ class MainApp(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.about(self, "Ошибка выбора типа графика: ", str(ex))
 
 
-def main():
+def run_app() -> int:
     app = QtWidgets.QApplication(sys.argv)
     window = MainApp()
     window.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+
+def main():
+    # python main.py --profile [file.prof] или H5_VISUALIZER_PROFILE=file.prof - профиль всей сессии
+    profile_path = get_profile_path(sys.argv)
+    if profile_path:
+        sys.exit(start_profiler(profile_path).run(run_app))
+    sys.exit(run_app())
 
 
 if __name__ == '__main__':
@@ -15,4 +15,11 @@ class Mark:
             raise Exception("xmin > xmax")
         self.xmin = xmin
         self.xmax = xmax
-        self.color = color
\ No newline at end of file
+        self.color = color
+
+    @staticmethod
+    def from_records(records) -> list:
+        """Marks from a structured array with xmin, xmax and rgba fields"""
+        return [Mark(xmin=xmin, xmax=xmax, color=QtGui.QColor(*rgba))
+                for xmin, xmax, rgba in zip(records['xmin'].tolist(), records['xmax'].tolist(),
+                                            records['rgba'].tolist())]
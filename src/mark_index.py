@@ -0,0 +1,126 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from mark import Mark
+
+
+class MarkIndex:
+    """Marks sorted by xmin with their bounds in numpy arrays.
+    Point lookup, row assignment and collision checks are binary searches."""
+
+    def __init__(self, marks=()):
+        self.set_marks(marks)
+
+    def set_marks(self, marks):
+        marks = list(marks)
+        self.marks = np.empty(shape=len(marks), dtype=object)
+        self.marks[:] = marks
+        self.rebuild()
+
+    def rebuild(self):
+        """Re-reads bounds of the marks (e.g. after a mark was edited in place) and re-sorts them"""
+        xmin = np.array([mark.xmin for mark in self.marks], dtype='float64')
+        order = np.argsort(xmin, kind='stable')
+        self.marks = self.marks[order]
+        self.xmin = xmin[order]
+        self.xmax = np.array([mark.xmax for mark in self.marks], dtype='float64')
+        # если метки всё же пересекаются после редактирования, правые границы не отсортированы
+        self._xmax_prefix = np.maximum.accumulate(self.xmax) if self.xmax.size else self.xmax
+
+    def copy(self) -> "MarkIndex":
+        """Snapshot of the index: later inserts/removals do not affect it"""
+        index = MarkIndex()
+        index.marks = self.marks.copy()
+        index.xmin = self.xmin.copy()
+        index.xmax = self.xmax.copy()
+        index._xmax_prefix = self._xmax_prefix.copy()
+        return index
+
+    def __len__(self):
+        return self.marks.shape[0]
+
+    def get_rgba(self) -> np.ndarray:
+        """(marks, 4) uint8 colors of the marks"""
+        return np.array([mark.color.getRgb() for mark in self.marks], dtype='uint8').reshape(-1, 4)
+
+    def insert(self, mark: "Mark") -> int:
+        pos = int(np.searchsorted(self.xmin, mark.xmin, side='right'))
+        self.marks = np.insert(self.marks, pos, None)
+        self.marks[pos] = mark
+        self.xmin = np.insert(self.xmin, pos, mark.xmin)
+        self.xmax = np.insert(self.xmax, pos, mark.xmax)
+        self._xmax_prefix = np.maximum.accumulate(self.xmax)
+        return pos
+
+    def remove_at(self, pos: int) -> "Mark":
+        mark = self.marks[pos]
+        self.marks = np.delete(self.marks, pos)
+        self.xmin = np.delete(self.xmin, pos)
+        self.xmax = np.delete(self.xmax, pos)
+        self._xmax_prefix = np.maximum.accumulate(self.xmax) if self.xmax.size else self.xmax
+        return mark
+
+    def position(self, mark: "Mark") -> int:
+        """Position of the mark object in the sorted order or -1"""
+        pos = int(np.searchsorted(self.xmin, mark.xmin, side='left'))
+        while pos < len(self) and self.xmin[pos] == mark.xmin:
+            if self.marks[pos] is mark:
+                return pos
+            pos += 1
+        return -1
+
+    def has_collision(self, xmin: float, xmax: float) -> bool:
+        """True if (xmin, xmax) overlaps any mark. Candidates are the marks starting
+        before xmax; one of them overlaps iff the largest right bound among them > xmin"""
+        count = int(np.searchsorted(self.xmin, xmax, side='left'))
+        return count > 0 and self._xmax_prefix[count - 1] > xmin
+
+    def collisions(self, xmin: np.ndarray, xmax: np.ndarray) -> np.ndarray:
+        """Per interval: True if it shares any x with a mark, bounds included (as in assign),
+        so single-sample intervals equal to or touching a mark also collide"""
+        count = np.searchsorted(self.xmin, xmax, side='right')
+        if not len(self):
+            return np.zeros(shape=count.shape, dtype=bool)
+        return (count > 0) & (self._xmax_prefix[np.maximum(count - 1, 0)] >= xmin)
+
+    def assign(self, x: np.ndarray) -> np.ndarray:
+        """Per value of x: position of the mark with xmin <= x <= xmax or -1"""
+        pos = np.searchsorted(self.xmin, x, side='right') - 1
+        if not len(self):
+            return pos.astype('int32')
+        inside = (pos >= 0) & (x <= self.xmax[np.maximum(pos, 0)])
+        return np.where(inside, pos, -1).astype('int32')
+
+    def find(self, x: float):
+        """Mark containing x or None"""
+        pos = int(np.searchsorted(self.xmin, x, side='right')) - 1
+        if pos >= 0 and x <= self.xmax[pos]:
+            return self.marks[pos]
+        return None
+
+
+class MarkArrays(MarkIndex):
+    """Read-only marks given only by xmin, xmax and rgba arrays, without Mark objects and Qt,
+    e.g. for the batch mode: lookups and export work as for a MarkIndex, `marks` holds None"""
+
+    def __init__(self, xmin: np.ndarray, xmax: np.ndarray, rgba: np.ndarray):
+        xmin = np.asarray(xmin, dtype='float64')
+        order = np.argsort(xmin, kind='stable')
+        self.marks = np.empty(shape=order.shape[0], dtype=object)
+        self.xmin = xmin[order]
+        self.xmax = np.asarray(xmax, dtype='float64')[order]
+        self.rgba = np.asarray(rgba, dtype='uint8').reshape(-1, 4)[order]
+        self._xmax_prefix = np.maximum.accumulate(self.xmax) if self.xmax.size else self.xmax
+
+    @staticmethod
+    def from_records(records: np.ndarray) -> "MarkArrays":
+        """From a structured array with xmin, xmax and rgba fields (see marks_storage)"""
+        return MarkArrays(records['xmin'], records['xmax'], records['rgba'])
+
+    def get_rgba(self) -> np.ndarray:
+        return self.rgba
+
+    def copy(self) -> "MarkArrays":
+        return MarkArrays(self.xmin, self.xmax, self.rgba)
@@ -0,0 +1,131 @@
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.path import Path
+
+from mark import Mark
+
+
+class SpanCollection(PolyCollection):
+    """PolyCollection that is animated only on screen: while its canvas saves the figure
+    (png, pdf, svg...) it is drawn like any other artist, so saved figures keep the marks"""
+
+    def __init__(self, canvas, **kwargs):
+        super().__init__([], animated=canvas.supports_blit, **kwargs)
+        self._screen_canvas = canvas
+
+    def get_animated(self):
+        return super().get_animated() and not self._screen_canvas.is_saving()
+
+
+class MarkLayer:
+    """Vertical spans of marks on an axes, all in one PolyCollection; spans are found by mark identity.
+    The collection is an animated artist: after every full draw the canvas without it is cached,
+    and a mark change only restores that background and blits the spans over it,
+    so it depends neither on the amount of plotted data nor much on the number of marks.
+    Every mark owns a slot (a path and a row of face colors) of the collection: an edit replaces
+    only that slot, a removal moves the last slot into the freed one."""
+
+    def __init__(self, ax, canvas):
+        self._ax = ax
+        self._canvas = canvas
+        # mark -> номер слота в коллекции
+        self._slots = {}
+        # метка каждого слота, для переноса последнего слота на место удалённого
+        self._marks = []
+        self._background = None
+        self._collection = None
+
+        self._canvas.mpl_connect('draw_event', self._on_draw)
+        self._attach()
+
+    def _attach(self):
+        # x в координатах данных, y во всю высоту осей
+        self._collection = SpanCollection(self._canvas, transform=self._ax.get_xaxis_transform(), linewidths=0)
+        self._ax.add_collection(self._collection, autolim=False)
+        self._ax.callbacks.connect('xlim_changed', self._invalidate_background)
+        self._ax.callbacks.connect('ylim_changed', self._invalidate_background)
+
+    def _invalidate_background(self, ax):
+        self._background = None
+
+    def _on_draw(self, event):
+        # при сохранении в файл событие приходит от другого холста (pdf, svg) или во время печати
+        if event.canvas is not self._canvas or self._canvas.is_saving() or not self._canvas.supports_blit:
+            return
+        self._background = self._canvas.copy_from_bbox(self._canvas.figure.bbox)
+        self._ax.draw_artist(self._collection)
+
+    def _refresh(self):
+        self._collection.stale = True
+        if self._background is None or not self._canvas.supports_blit:
+            self._canvas.draw_idle()
+            return
+        self._canvas.restore_region(self._background)
+        self._ax.draw_artist(self._collection)
+        self._canvas.blit(self._canvas.figure.bbox)
+
+    @staticmethod
+    def _path(mark: Mark) -> Path:
+        return Path([(mark.xmin, 0), (mark.xmin, 1), (mark.xmax, 1), (mark.xmax, 0), (mark.xmin, 0)], closed=True)
+
+    def _fill(self, marks):
+        marks = list(marks)
+        self._marks = marks
+        self._slots = {mark: slot for slot, mark in enumerate(marks)}
+        self._collection.get_paths()[:] = [self._path(mark) for mark in marks]
+        self._collection.set_facecolor(np.array([mark.color.getRgbF() for mark in marks],
+                                                dtype='float64').reshape(-1, 4))
+
+    def reset(self, ax, marks):
+        """Attaches the layer to a cleared axes and creates spans for all marks"""
+        self._ax = ax
+        self._background = None
+        self._attach()
+        self._fill(marks)
+
+    def set_marks(self, marks):
+        self._fill(marks)
+        self._refresh()
+
+    def add_mark(self, mark: Mark):
+        if mark in self._slots:
+            self.update_mark(mark)
+            return
+        self._slots[mark] = len(self._marks)
+        self._marks.append(mark)
+        self._collection.get_paths().append(self._path(mark))
+        self._collection.set_facecolor(np.vstack((self._collection.get_facecolor(), mark.color.getRgbF())))
+        self._refresh()
+
+    def update_mark(self, mark: Mark):
+        slot = self._slots.get(mark)
+        if slot is None:
+            self.add_mark(mark)
+            return
+        self._collection.get_paths()[slot] = self._path(mark)
+        # get_facecolor возвращает массив самой коллекции, меняется одна строка
+        self._collection.get_facecolor()[slot] = mark.color.getRgbF()
+        self._refresh()
+
+    def remove_mark(self, mark: Mark):
+        slot = self._slots.pop(mark, None)
+        if slot is None:
+            return
+        paths = self._collection.get_paths()
+        colors = self._collection.get_facecolor()
+        last = len(self._marks) - 1
+        if slot != last:
+            moved = self._marks[last]
+            self._marks[slot] = moved
+            self._slots[moved] = slot
+            paths[slot] = paths[last]
+            colors[slot] = colors[last]
+        self._marks.pop()
+        paths.pop()
+        self._collection.set_facecolor(colors[:last])
+        self._refresh()
+
+    def clear(self, refresh: bool = True):
+        self._fill(())
+        if refresh:
+            self._refresh()
@@ -0,0 +1,176 @@
+import numpy as np
+
+from mark_index import MarkIndex
+
+
+STAT_NAMES = ('mean', 'std', 'min', 'max', 'rms')
+# строк в одном блоке при подсчёте статистики по файлу
+STATS_BLOCK_ROWS = 1 << 20
+
+
+def interval_sums(x: np.ndarray, values: np.ndarray, xmin: np.ndarray, xmax: np.ndarray) -> dict:
+    """Sums of values (rows x channels) over the rows with xmin <= x <= xmax of every
+    interval, for all intervals at once: row bounds by searchsorted on sorted x and
+    sums/minima/maxima by reduceat over [start0, stop0, start1, stop1, ...].
+    Only the rows between the first start and the last stop are touched.
+    Returns {'count', 'total', 'total_sq', 'min', 'max'}; empty intervals have 0, +inf, -inf"""
+    intervals = xmin.shape[0]
+    channels = values.shape[1]
+    starts = np.searchsorted(x, xmin, side='left')
+    stops = np.searchsorted(x, xmax, side='right')
+    count = np.maximum(stops - starts, 0)
+    sums = {
+        'count': count,
+        'total': np.zeros(shape=(intervals, channels)),
+        'total_sq': np.zeros(shape=(intervals, channels)),
+        'min': np.full(shape=(intervals, channels), fill_value=np.inf),
+        'max': np.full(shape=(intervals, channels), fill_value=-np.inf),
+    }
+    if not count.any():
+        return sums
+
+    low = int(starts.min())
+    high = int(stops.max())
+    # строка-заглушка в конце, чтобы граница stop == high была допустимым индексом reduceat
+    span = np.empty(shape=(high - low + 1, channels))
+    span[:-1] = values[low:high]
+    span[-1] = 0
+    bounds = np.empty(shape=2 * intervals, dtype='int64')
+    bounds[0::2] = np.minimum(starts, stops) - low
+    bounds[1::2] = stops - low
+
+    # у пустых интервалов reduceat возвращает одну строку, они не заполняются
+    full = count > 0
+    sums['total'][full] = np.add.reduceat(span, bounds, axis=0)[0::2][full]
+    sums['total_sq'][full] = np.add.reduceat(span * span, bounds, axis=0)[0::2][full]
+    sums['min'][full] = np.minimum.reduceat(span, bounds, axis=0)[0::2][full]
+    sums['max'][full] = np.maximum.reduceat(span, bounds, axis=0)[0::2][full]
+    return sums
+
+
+def add_interval_sums(sums: dict, part: dict, rows: np.ndarray):
+    """Adds sums of the intervals `rows` computed over another block of data"""
+    sums['count'][rows] += part['count']
+    sums['total'][rows] += part['total']
+    sums['total_sq'][rows] += part['total_sq']
+    sums['min'][rows] = np.minimum(sums['min'][rows], part['min'])
+    sums['max'][rows] = np.maximum(sums['max'][rows], part['max'])
+
+
+def finish_interval_stats(sums: dict) -> dict:
+    """{'count': (intervals,), name: (intervals, channels) for STAT_NAMES}; NaN for empty intervals"""
+    count = sums['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n = np.where(count > 0, count, np.nan)[:, np.newaxis]
+        mean = sums['total'] / n
+        mean_sq = sums['total_sq'] / n
+    empty = count == 0
+    lowest = sums['min'].copy()
+    highest = sums['max'].copy()
+    lowest[empty] = np.nan
+    highest[empty] = np.nan
+    return {
+        'count': count,
+        'mean': mean,
+        'std': np.sqrt(np.maximum(mean_sq - mean * mean, 0)),
+        'min': lowest,
+        'max': highest,
+        'rms': np.sqrt(mean_sq),
+    }
+
+
+def compute_interval_stats(x: np.ndarray, values: np.ndarray, xmin: np.ndarray, xmax: np.ndarray) -> dict:
+    """Statistics of every interval over data in memory, see interval_sums"""
+    return finish_interval_stats(interval_sums(x, values, xmin, xmax))
+
+
+def compute_interval_stats_rows(row_reader, starts: np.ndarray, stops: np.ndarray,
+                                xmin: np.ndarray, xmax: np.ndarray, channels: int,
+                                block_rows: int = STATS_BLOCK_ROWS, task=None) -> dict:
+    """Statistics of every interval over rows [x, channels...] read through row_reader(start, stop),
+    e.g. in lazy mode. Only the row ranges [starts, stops) covering the intervals are read,
+    in blocks; sums of an interval split between blocks are added up."""
+    sums = interval_sums(np.empty(0), np.empty(shape=(0, channels)), xmin, xmax)
+    # пересекающиеся диапазоны строк объединяются, чтобы каждая строка читалась один раз
+    order = np.argsort(starts, kind='stable')
+    spans = []
+    for start, stop in zip(starts[order].tolist(), stops[order].tolist()):
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], stop)
+        elif stop > start:
+            spans.append([start, stop])
+
+    total = sum(stop - start for start, stop in spans)
+    done = 0
+    for span_start, span_stop in spans:
+        for start in range(span_start, span_stop, block_rows):
+            if task:
+                task.check_cancelled()
+            stop = min(span_stop, start + block_rows)
+            block = row_reader(start, stop)
+            rows = np.flatnonzero((starts < stop) & (stops > start))
+            add_interval_sums(sums, interval_sums(block[:, 0], block[:, 1:], xmin[rows], xmax[rows]), rows)
+            done += stop - start
+            if task:
+                task.report_progress(done, total)
+    return finish_interval_stats(sums)
+
+
+class MarkStats:
+    """Per mark and channel statistics in the order of a MarkIndex.
+    Bounds of every mark are remembered with its statistics: only marks that are new
+    or were moved since are computed again, so editing one mark costs one interval
+    whatever the number of marks."""
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return self.marks.shape[0]
+
+    def clear(self, channels: int = 0):
+        self.marks = np.empty(shape=0, dtype=object)
+        self.xmin = np.empty(shape=0)
+        self.xmax = np.empty(shape=0)
+        self.stats = compute_interval_stats(np.empty(0), np.empty(shape=(0, channels)), np.empty(0), np.empty(0))
+
+    def _get_old_rows(self, mark_index: MarkIndex) -> np.ndarray:
+        """Row of every mark of mark_index with still valid statistics or -1"""
+        old_rows = {id(mark): row for row, mark in enumerate(self.marks)}
+        order = np.array([old_rows.get(id(mark), -1) for mark in mark_index.marks], dtype='int64')
+        valid = order >= 0
+        valid[valid] = (self.xmin[order[valid]] == mark_index.xmin[valid]) & \
+                       (self.xmax[order[valid]] == mark_index.xmax[valid])
+        return np.where(valid, order, -1)
+
+    def get_pending(self, mark_index: MarkIndex) -> np.ndarray:
+        """Positions of the marks of mark_index which statistics are to be computed"""
+        return np.flatnonzero(self._get_old_rows(mark_index) < 0)
+
+    def merge(self, mark_index: MarkIndex, positions: np.ndarray, computed: dict):
+        """Follows mark_index: statistics of `positions` are `computed`, of others are kept.
+        positions must be get_pending(mark_index) of the current state"""
+        order = self._get_old_rows(mark_index)
+        kept = order >= 0
+        stats = {}
+        for name, arr in computed.items():
+            merged = np.empty(shape=(order.shape[0],) + arr.shape[1:], dtype=arr.dtype)
+            if kept.any():
+                merged[kept] = self.stats[name][order[kept]]
+            merged[positions] = arr
+            stats[name] = merged
+        self.stats = stats
+        self.marks = mark_index.marks.copy()
+        self.xmin = mark_index.xmin.copy()
+        self.xmax = mark_index.xmax.copy()
+
+    def sync(self, mark_index: MarkIndex, x: np.ndarray, values: np.ndarray):
+        """Follows mark_index after marks were added, removed or edited, over data in memory"""
+        positions = self.get_pending(mark_index)
+        self.merge(mark_index, positions, compute_interval_stats(x, values, mark_index.xmin[positions],
+                                                                 mark_index.xmax[positions]))
+
+    def reset(self, mark_index: MarkIndex, x: np.ndarray, values: np.ndarray):
+        """Computes all marks anew, e.g. for other data"""
+        self.clear(values.shape[1])
+        self.sync(mark_index, x, values)
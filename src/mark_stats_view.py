@@ -0,0 +1,42 @@
+from PyQt6 import QtWidgets
+
+from table_mark_stats_model import TableMarkStatsModel
+
+
+class MarkStatsView(QtWidgets.QWidget):
+    """Channel selector and the table of per mark statistics"""
+
+    def __init__(self, model: TableMarkStatsModel, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._model = model
+        self.comboBoxChannel = QtWidgets.QComboBox()
+        self.comboBoxChannel.currentIndexChanged.connect(self.on_channel_changed)
+        self.tableView = QtWidgets.QTableView()
+        self.tableView.setModel(model)
+        self.tableView.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(QtWidgets.QLabel("Канал"))
+        controls.addWidget(self.comboBoxChannel)
+        controls.addStretch()
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.tableView)
+
+    def set_channels(self, headers: dict):
+        current = self.comboBoxChannel.currentData()
+        self.comboBoxChannel.blockSignals(True)
+        self.comboBoxChannel.clear()
+        for col, name in headers.items():
+            if col > 0:
+                self.comboBoxChannel.addItem(name, col)
+        index = self.comboBoxChannel.findData(current)
+        self.comboBoxChannel.setCurrentIndex(max(index, 0))
+        self.comboBoxChannel.blockSignals(False)
+        self.on_channel_changed()
+
+    def on_channel_changed(self):
+        channel = self.comboBoxChannel.currentData()
+        if channel is not None:
+            self._model.set_channel(channel)
@@ -0,0 +1,75 @@
+import os
+
+import h5py
+import numpy as np
+
+from h5_loader import get_first_dataset_name
+
+
+MARKS_DTYPE = np.dtype([
+    ('xmin', 'f8'),
+    ('xmax', 'f8'),
+    ('rgba', 'u1', (4,)),
+])
+MARKS_DATASET = 'marks'
+# имя атрибута, если метки хранятся в самом исходном файле
+MARKS_ATTRIBUTE = 'h5_visualizer_marks'
+MARKS_SUFFIX = ".marks.h5"
+
+
+def get_marks_path(source_path: str) -> str:
+    return source_path + MARKS_SUFFIX
+
+
+def marks_to_array(mark_index) -> np.ndarray:
+    arr = np.empty(shape=len(mark_index), dtype=MARKS_DTYPE)
+    arr['xmin'] = mark_index.xmin
+    arr['xmax'] = mark_index.xmax
+    arr['rgba'] = mark_index.get_rgba()
+    return arr
+
+
+def write_marks_array(path: str, marks: np.ndarray):
+    """Marks file: one structured 'marks' dataset"""
+    with h5py.File(path, "w") as f:
+        f.create_dataset(MARKS_DATASET, data=marks)
+
+
+def read_marks_array(path: str) -> np.ndarray:
+    """Marks from a marks file (or an exported h5 with 'segments') in one read"""
+    with h5py.File(path, "r") as f:
+        name = MARKS_DATASET if MARKS_DATASET in f else 'segments'
+        return np.asarray(f[name][...])
+
+
+def save_marks(source_path: str, dataset_name: str, marks: np.ndarray, in_source: bool = False) -> tuple:
+    """Saves marks to the source dataset attribute (if asked and the file is writable)
+    or to the sidecar file. Returns (where they were saved, why not to the source file or None)"""
+    error = None
+    if in_source:
+        try:
+            with h5py.File(source_path, "r+") as f:
+                f[dataset_name or get_first_dataset_name(f)].attrs[MARKS_ATTRIBUTE] = marks
+            sidecar = get_marks_path(source_path)
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            return source_path, None
+        except (OSError, RuntimeError, KeyError) as ex:
+            error = str(ex)
+
+    sidecar = get_marks_path(source_path)
+    write_marks_array(sidecar, marks)
+    return sidecar, error
+
+
+def load_marks(source_path: str, dataset_name: str = None):
+    """Marks saved for a source file: sidecar first, then the dataset attribute. None if absent"""
+    sidecar = get_marks_path(source_path)
+    if os.path.exists(sidecar):
+        return read_marks_array(sidecar)
+
+    with h5py.File(source_path, "r") as f:
+        dataset_name = dataset_name or get_first_dataset_name(f)
+        if dataset_name in f and MARKS_ATTRIBUTE in f[dataset_name].attrs:
+            return np.asarray(f[dataset_name].attrs[MARKS_ATTRIBUTE])
+    return None
@@ -1,16 +1,20 @@
 import logging
 import math
+import time
 import weakref
 
 import numpy
 
-import matplotlib.pyplot as _plt
+from matplotlib.patches import Rectangle
 from matplotlib.backend_bases import MouseButton
 
 
 class MplInteraction(object):
     """Base class for class providing interaction to a matplotlib Figure."""
 
+    # Maximum number of full redraws per second
+    max_fps = 30
+
     def __init__(self, figure):
         """Initializer
         :param Figure figure: The matplotlib figure to attach the behavior to.
@@ -18,6 +22,11 @@ class MplInteraction(object):
         self._fig_ref = weakref.ref(figure)
         self._cids = []
 
+        self._last_draw_time = 0.
+        self._frame_timer = None  # Created on first use, the canvas may change
+        self._frame_pending = False
+        self._needs_redraw = False
+
     def __del__(self):
         self.disconnect()
 
@@ -68,9 +77,44 @@ class MplInteraction(object):
 
         return x_axes, y_axes
 
+    def _frame_interval(self):
+        return 1. / self.max_fps
+
+    def _schedule_frame(self):
+        """Calls _on_frame once the current frame interval is over.
+        Several requests within one frame are coalesced into one call."""
+        if self._frame_pending:
+            return
+        self._frame_pending = True
+
+        delay = self._last_draw_time + self._frame_interval() - time.perf_counter()
+        if delay <= 0:
+            self._run_frame()
+            return
+
+        if self._frame_timer is None:
+            self._frame_timer = self.figure.canvas.new_timer()
+            self._frame_timer.single_shot = True
+            self._frame_timer.add_callback(self._run_frame)
+        self._frame_timer.interval = max(1, int(delay * 1000))
+        self._frame_timer.start()
+
+    def _run_frame(self):
+        self._frame_pending = False
+        if self.figure is not None:
+            self._on_frame()
+
+    def _on_frame(self):
+        """Called at most once per frame, redraws the figure if requested"""
+        if self._needs_redraw:
+            self._needs_redraw = False
+            self._last_draw_time = time.perf_counter()
+            self.figure.canvas.draw_idle()
+
     def _draw(self):
-        """Conveninent method to redraw the figure"""
-        self.figure.canvas.draw()
+        """Requests a redraw of the figure, at most one per frame"""
+        self._needs_redraw = True
+        self._schedule_frame()
 
 
 class ZoomOnWheel(MplInteraction):
@@ -178,6 +222,8 @@ class PanAndZoom(ZoomOnWheel):
         self._pressed_button = None  # To store active button
         self._axes = None  # To store x and y axes concerned by interaction
         self._event = None  # To store reference event during interaction
+        self._motion_event = None  # Last motion event not processed yet
+        self._background = None  # Canvas copy under the zoom rectangle
 
     @staticmethod
     def _pan_update_limits(ax, axis_id, event, last_event):
@@ -232,21 +278,33 @@ class PanAndZoom(ZoomOnWheel):
                     ax.set_ylim(ylim)
 
             if event.x != self._event.x or event.y != self._event.y:
-                self._draw()
+                self._needs_redraw = True
 
             self._event = event
 
     def _zoom_area(self, event):
         if event.name == 'button_press_event':  # begin drag
             self._event = event
-            self._patch = _plt.Rectangle(
+            canvas = self.figure.canvas
+            self._patch = Rectangle(
                 xy=(event.xdata, event.ydata), width=0, height=0,
-                fill=False, linewidth=1., linestyle='solid', color='black')
+                fill=False, linewidth=1., linestyle='solid', color='black',
+                animated=canvas.supports_blit)
             self._event.inaxes.add_patch(self._patch)
 
+            if canvas.supports_blit:
+                # The rectangle is animated: not part of the cached background
+                canvas.draw()
+                self._background = canvas.copy_from_bbox(self.figure.bbox)
+            else:
+                self._needs_redraw = True
+            return
+
         elif event.name == 'button_release_event':  # end drag
             self._patch.remove()
             del self._patch
+            self._background = None
+            self._draw()
 
             if (abs(event.x - self._event.x) < 3 or
                     abs(event.y - self._event.y) < 3):
@@ -292,7 +350,13 @@ class PanAndZoom(ZoomOnWheel):
             self._patch.set_width(event.xdata - self._event.xdata)
             self._patch.set_height(event.ydata - self._event.ydata)
 
-        self._draw()
+            if self._background is not None:
+                canvas = self.figure.canvas
+                canvas.restore_region(self._background)
+                self._event.inaxes.draw_artist(self._patch)
+                canvas.blit(self.figure.bbox)
+            else:
+                self._needs_redraw = True
 
     def _on_mouse_press(self, event):
         if self._pressed_button is not None:
@@ -311,14 +375,31 @@ class PanAndZoom(ZoomOnWheel):
 
     def _on_mouse_release(self, event):
         if self._pressed_button == event.button:
+            self._process_motion()
             if self._pressed_button == MouseButton.RIGHT:  # pan
                 self._pan(event)
             elif self._pressed_button == MouseButton.MIDDLE:  # zoom area
                 self._zoom_area(event)
             self._pressed_button = None
+            if self._needs_redraw:
+                self._draw()
 
     def _on_mouse_motion(self, event):
+        if self._pressed_button is None:
+            return
+        # Only the last motion event of a frame is processed
+        self._motion_event = event
+        self._schedule_frame()
+
+    def _process_motion(self):
+        event, self._motion_event = self._motion_event, None
+        if event is None:
+            return
         if self._pressed_button == MouseButton.RIGHT:  # pan
             self._pan(event)
         elif self._pressed_button == MouseButton.MIDDLE:  # zoom area
             self._zoom_area(event)
+
+    def _on_frame(self):
+        self._process_motion()
+        super(PanAndZoom, self)._on_frame()
@@ -1,19 +1,27 @@
-import matplotlib.pyplot as plt
 import numpy as np
 from enum import Enum
 
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.widgets import RectangleSelector, SpanSelector
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.widgets import SpanSelector
 from matplotlib.backend_bases import MouseButton
 
 from pan_and_zoom import PanAndZoom
 from mark import Mark
+from plot_pyramid import MinMaxPyramid
+from decimation import minmax_per_pixel, get_visible_range
+from mark_layer import MarkLayer
+from stacked_traces import StackedTraces, GAIN_STEP
+from density_raster import DensityRaster
+from signal_filter import FilteredSignal
+from timing import timed, stage_timer
 
 
 class GraphTypes(Enum):
     plot = 'Plot'
     scatter = 'Scatter'
+    stacked = 'Stacked'
+    density = 'Density'
 
 
 class MyPlot:
@@ -22,20 +30,169 @@ class MyPlot:
     _current_xmin = None
     _current_xmax = None
 
-    _span_marks_list = []
+    _pyramid: MinMaxPyramid = None
+    _row_reader = None
+    _filter: FilteredSignal = None
 
     def __init__(self):
-        fig = plt.figure()
+        # фигура без pyplot: не регистрируется в глобальном менеджере фигур
+        fig = Figure()
         fig.pan_zoom = PanAndZoom(fig)
         self._canvas = FigureCanvas(fig)
         self._static_ax = self._canvas.figure.subplots()
 
+        # линии графика, которые перестраиваются под видимый диапазон
+        self._data = None
+        self._lines = []
+        self._stacked: StackedTraces = None
+        self._density: DensityRaster = None
+        self._canvas.mpl_connect('resize_event', self._on_resize)
+        # изменения xlim и ylim за один шаг панорамирования дают одно обновление линий
+        self._limits_timer = self._canvas.new_timer(interval=0)
+        self._limits_timer.single_shot = True
+        self._limits_timer.add_callback(self._on_limits_timer)
+        self._limits_pending = False
+        self._canvas.mpl_connect('key_press_event', self._on_key_press)
+        self._canvas.mpl_connect('key_press_event', MyPlot.toggle_selector)
+
+        self._mark_layer = MarkLayer(self._static_ax, self._canvas)
+
     def get_canvas(self):
         return self._canvas
 
     def get_ax(self):
         return self._static_ax
 
+    def set_pyramid(self, pyramid: MinMaxPyramid):
+        self._pyramid = pyramid
+
+    def set_row_reader(self, row_reader):
+        """row_reader(start, stop) -> 2D array of source rows. Used in lazy mode, when
+        draw_plot gets only a decimated overview, to show raw rows on deep zoom"""
+        self._row_reader = row_reader
+
+    def set_filter(self, signal: FilteredSignal):
+        """Filtered rows of the data: while filters are active, lines and density are built from them"""
+        self._filter = signal
+
+    def _get_filtered_rows(self, data: np.array, xmin: float, xmax: float, pixels: int):
+        """Filtered source rows covering [xmin, xmax] or None if filters are off
+        or source rows of x are not known yet (lazy mode before the pyramid is built).
+        A range with more than envelope_bucket rows per pixel is returned as the cached
+        min/max envelope of the filtered signal instead of filtering all its rows."""
+        if self._filter is None or not self._filter.is_active():
+            return None
+        if self._filter.rows == data.shape[0]:
+            start, stop = get_visible_range(data[:, 0], xmin, xmax)
+        elif self._pyramid is not None:
+            start, stop = self._pyramid.x_to_rows(xmin, xmax)
+        else:
+            return None
+        if stop - start > self._filter.envelope_bucket * pixels:
+            x, y = self._filter.get_envelope(start, stop)
+            return np.column_stack((x, y))
+        return self._filter.get_rows(start, stop)
+
+    def _get_visible_lines(self, data: np.array, xmin: float, xmax: float):
+        """x and 2D y of the lines for [xmin, xmax] with about two points per pixel:
+        min/max envelope from the pyramid level matching the axes width, or the raw
+        slice decimated with min/max per pixel"""
+        pixels = max(1, int(self._static_ax.bbox.width))
+
+        rows = self._get_filtered_rows(data, xmin, xmax, pixels)
+        if rows is not None:
+            return minmax_per_pixel(rows[:, 0], rows[:, 1:], pixels)
+
+        if self._pyramid is not None and self._pyramid.channels == data.shape[1] - 1:
+            level = self._pyramid.choose_level(xmin, xmax, pixels)
+            if level >= 0:
+                return self._pyramid.get_envelope(level, xmin, xmax)
+            if self._row_reader is not None:
+                rows = self._row_reader(*self._pyramid.x_to_rows(xmin, xmax))
+                if rows.shape[0]:
+                    return rows[:, 0], rows[:, 1:]
+
+        start, stop = get_visible_range(data[:, 0], xmin, xmax)
+        return minmax_per_pixel(data[start:stop, 0], data[start:stop, 1:], pixels)
+
+    @timed('visible lines')
+    def update_visible_lines(self):
+        """Replaces data of existing lines with the visible slice, without redrawing the axes"""
+        if self._data is None or not (self._lines or self._stacked or self._density):
+            return
+
+        xmin, xmax = self._static_ax.get_xlim()
+        if self._density is not None:
+            ymin, ymax = self._static_ax.get_ylim()
+            xlim = (min(xmin, xmax), max(xmin, xmax))
+            rows = self._get_filtered_rows(self._data, *xlim, max(1, int(self._static_ax.bbox.width)))
+            self._density.update(self._data if rows is None else rows, xlim, (min(ymin, ymax), max(ymin, ymax)))
+            return
+        x, y = self._get_visible_lines(self._data, min(xmin, xmax), max(xmin, xmax))
+        for i, line in enumerate(self._lines):
+            line.set_data(x, y[:, i])
+        if self._stacked is not None:
+            self._stacked.set_data(x, y)
+
+    def append_data(self, data: np.ndarray, block: np.ndarray) -> bool:
+        """Rows of block were appended to the end of data: extends the pyramid and refills the
+        visible lines. A view that showed the last row scrolls (or grows, if it showed
+        the first row too) to keep showing it. False if the graph type needs draw_plot"""
+        if self._data is None or not self._data.size or not (self._lines or self._stacked or self._density):
+            return False
+
+        first_x, last_x = self._data[0, 0], self._data[-1, 0]
+        self._data = data
+        if self._pyramid is not None and self._pyramid.channels == data.shape[1] - 1:
+            self._pyramid.extend(block)
+
+        if self._lines:
+            ymin, ymax = self._static_ax.get_ylim()
+            low, high = np.nanmin(block[:, 1:]), np.nanmax(block[:, 1:])
+            if low < ymin or high > ymax:
+                self._static_ax.set_ylim(min(low, ymin), max(high, ymax))
+
+        xmin, xmax = self._static_ax.get_xlim()
+        if xmax >= last_x:
+            shift = data[-1, 0] - last_x
+            # set_xlim вызывает update_visible_lines через xlim_changed (отложенно)
+            self._static_ax.set_xlim(xmin if xmin <= first_x else xmin + shift, xmax + shift)
+        else:
+            self.update_visible_lines()
+        self._canvas.draw_idle()
+        return True
+
+    def _on_limits_changed(self, ax):
+        if not self._limits_pending:
+            self._limits_pending = True
+            self._limits_timer.start()
+
+    def _on_limits_timer(self):
+        self._limits_pending = False
+        self.update_visible_lines()
+        self._canvas.draw_idle()
+
+    def _on_resize(self, event):
+        self.update_visible_lines()
+
+    def _on_key_press(self, event):
+        # в режиме Stacked +/- меняют усиление всех каналов, стрелки вверх/вниз - канала под курсором
+        if self._stacked is None:
+            return
+        if event.key in ('+', '-'):
+            self._stacked.scale_gains(GAIN_STEP if event.key == '+' else 1 / GAIN_STEP)
+            self._canvas.draw_idle()
+        elif event.key in ('up', 'down') and event.inaxes is self._static_ax:
+            channel = self._stacked.channel_at(event.ydata)
+            factor = GAIN_STEP if event.key == 'up' else 1 / GAIN_STEP
+            self.set_channel_gain(channel + 1, self._stacked.gains[channel] * factor)
+
+    def set_channel_gain(self, channel: int, gain: float):
+        """Gain of a channel (1-based column of the data) in the Stacked mode"""
+        if self._stacked is not None:
+            self._stacked.set_gain(channel - 1, gain)
+            self._canvas.draw_idle()
+
     def get_xmin_xmax(self):
         return self._current_xmin, self._current_xmax
 
@@ -44,15 +201,16 @@ class MyPlot:
         MyPlot._current_xmin = None
         MyPlot._current_xmax = None
 
-    def add_span_mark(self, mark: Mark):
-        span = self._static_ax.axvspan(xmin=mark.xmin, xmax=mark.xmax, facecolor=mark.color.name(), alpha=mark.color.alphaF())
-        self._span_marks_list.append(span)
+    def add_mark(self, mark: Mark):
+        self._mark_layer.add_mark(mark)
+
+    def update_mark(self, mark: Mark):
+        self._mark_layer.update_mark(mark)
 
-    def remove_span_marks(self):
-        for span in self._span_marks_list:
-            span.remove()
-        self._span_marks_list.clear()
+    def remove_mark(self, mark: Mark):
+        self._mark_layer.remove_mark(mark)
 
+    @timed('draw')
     def draw_plot(self, data: np.array, headers: dict, marks, graph_type: GraphTypes):
         divider = 250
 
@@ -71,39 +229,58 @@ class MyPlot:
             return
 
         self._static_ax.cla()
+        self._data = data
+        self._lines = []
+        self._stacked = None
+        self._density = None
 
         cols = data.shape[1]
-        for i in range(1, cols):
-            if graph_type == GraphTypes.scatter:
-                self._static_ax.scatter(data[:, 0], data[:, i], label=headers[i])
-            elif graph_type == GraphTypes.plot:
-                self._static_ax.plot(data[:, 0], data[:, i], label=headers[i])
-            else:
-                raise Exception("Unknown graph type: ", graph_type.value)
+        if graph_type in (GraphTypes.plot, GraphTypes.stacked):
+            x, y = self._get_visible_lines(data, data[0, 0], data[-1, 0])
+        if graph_type == GraphTypes.stacked:
+            self._stacked = StackedTraces(self._static_ax, [headers[i] for i in range(1, cols)])
+            self._stacked.auto_gain(y)
+            self._stacked.set_data(x, y)
+            self._static_ax.set_xlim(data[0, 0], data[-1, 0])
+        elif graph_type == GraphTypes.density:
+            self._density = DensityRaster(self._static_ax, [headers[i] for i in range(1, cols)])
+            # пределы задаются явно, иначе imshow подгоняет оси под каждое новое изображение
+            self._static_ax.set_autoscale_on(False)
+            self._static_ax.set_xlim(data[0, 0], data[-1, 0])
+            self._static_ax.set_ylim(np.nanmin(data[:, 1:]), np.nanmax(data[:, 1:]))
+            self.update_visible_lines()
+        else:
+            for i in range(1, cols):
+                if graph_type == GraphTypes.scatter:
+                    self._static_ax.scatter(data[:, 0], data[:, i], label=headers[i])
+                elif graph_type == GraphTypes.plot:
+                    line, = self._static_ax.plot(x, y[:, i - 1], label=headers[i])
+                    self._lines.append(line)
+                else:
+                    raise Exception("Unknown graph type: ", graph_type.value)
 
         self._static_ax.grid(True, color="grey", linewidth="0.4", linestyle="-.")
-        self._static_ax.legend()
+        if graph_type not in (GraphTypes.stacked, GraphTypes.density):
+            self._static_ax.legend()
 
-        plt.xlabel(headers[0])
+        self._static_ax.set_xlabel(headers[0])
 
-        toggle_selector = self.get_selector(self._static_ax)
-        plt.connect('key_press_event', toggle_selector)
+        self.get_selector(self._static_ax)
 
         secondary_ax = self._static_ax.secondary_xaxis('top', functions=(scale_second_xaxis_to, scale_second_xaxis_from))
         secondary_ax.set_xlabel(f"{headers[0]} / {divider}")
 
-        for mark in marks:
-            self.add_span_mark(mark)
+        self._mark_layer.reset(self._static_ax, marks)
 
-        self._canvas.draw()
+        self._static_ax.callbacks.connect('xlim_changed', self._on_limits_changed)
+        if self._density is not None:
+            self._static_ax.callbacks.connect('ylim_changed', self._on_limits_changed)
 
-    def update_plot(self, marks):
-        self.remove_span_marks()
+        with stage_timer.measure('render'):
+            self._canvas.draw()
 
-        for mark in marks:
-            self.add_span_mark(mark)
-
-        self._canvas.draw()
+    def update_plot(self, marks):
+        self._mark_layer.set_marks(marks)
 
     @staticmethod
     def deactivate_selector():
@@ -0,0 +1,219 @@
+import os
+
+import numpy as np
+
+
+# Уровень k объединяет BASE_BUCKET * LEVEL_FACTOR**k исходных строк
+BASE_BUCKET = 8
+LEVEL_FACTOR = 4
+LEVELS = 8
+
+
+def make_cache_key(path: str, extra: str = "") -> str:
+    """Key of a sidecar file: source path + mtime + size (+ dataset names etc.)"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{extra}"
+
+
+def get_sidecar_path(path: str) -> str:
+    return path + ".pyramid.npz"
+
+
+class _GrowingArray:
+    """2D array with amortized O(1) appends along the first axis"""
+
+    def __init__(self, cols: int):
+        self._buf = np.empty(shape=(0, cols))
+        self.size = 0
+
+    def append(self, rows: np.ndarray):
+        needed = self.size + rows.shape[0]
+        if needed > self._buf.shape[0]:
+            buf = np.empty(shape=(max(needed, 2 * self._buf.shape[0], 64), self._buf.shape[1]))
+            buf[:self.size] = self._buf[:self.size]
+            self._buf = buf
+        self._buf[self.size:needed] = rows
+        self.size = needed
+
+    def get(self) -> np.ndarray:
+        return self._buf[:self.size]
+
+
+class MinMaxPyramid:
+    """Per-channel min/max envelopes of a signal at several decimation levels.
+    Input rows are [x, channel1, channel2, ...]. Every level keeps, for each
+    bucket, x of its first row and min/max of every channel. The pyramid is
+    built with vectorized reshape reductions and can be extended with new rows."""
+
+    def __init__(self, channels: int, base: int = BASE_BUCKET, factor: int = LEVEL_FACTOR, levels: int = LEVELS):
+        self.channels = channels
+        self.base = base
+        self.factor = factor
+        # колонки уровня: x, min по каналам, max по каналам
+        self._levels = [_GrowingArray(1 + 2 * channels) for _ in range(levels)]
+        self._tail = np.empty(shape=(0, 1 + channels))
+
+    @staticmethod
+    def build(data: np.ndarray, **kwargs) -> "MinMaxPyramid":
+        pyramid = MinMaxPyramid(data.shape[1] - 1, **kwargs)
+        pyramid.extend(data)
+        return pyramid
+
+    @property
+    def levels(self) -> int:
+        return len(self._levels)
+
+    def bucket_size(self, level: int) -> int:
+        return self.base * self.factor ** level
+
+    def rows(self) -> int:
+        return self._levels[0].size * self.base + self._tail.shape[0]
+
+    def extend(self, block: np.ndarray):
+        """Adds rows [x, channels...]; only completed buckets reach the levels"""
+        if self._tail.shape[0]:
+            block = np.vstack((self._tail, block))
+
+        full = block.shape[0] // self.base * self.base
+        self._tail = block[full:].copy()
+        if not full:
+            return
+
+        raw = block[:full].reshape(-1, self.base, block.shape[1])
+        level = np.empty(shape=(raw.shape[0], 1 + 2 * self.channels))
+        level[:, 0] = raw[:, 0, 0]
+        np.min(raw[:, :, 1:], axis=1, out=level[:, 1:1 + self.channels])
+        np.max(raw[:, :, 1:], axis=1, out=level[:, 1 + self.channels:])
+        self._levels[0].append(level)
+
+        for k in range(1, self.levels):
+            lower = self._levels[k - 1].get()
+            consumed = self._levels[k].size * self.factor
+            ready = (lower.shape[0] - consumed) // self.factor * self.factor
+            if not ready:
+                break
+            grouped = lower[consumed:consumed + ready].reshape(-1, self.factor, lower.shape[1])
+            level = np.empty(shape=(grouped.shape[0], lower.shape[1]))
+            level[:, 0] = grouped[:, 0, 0]
+            np.min(grouped[:, :, 1:1 + self.channels], axis=1, out=level[:, 1:1 + self.channels])
+            np.max(grouped[:, :, 1 + self.channels:], axis=1, out=level[:, 1 + self.channels:])
+            self._levels[k].append(level)
+
+    def _get_level_parts(self, level: int) -> list:
+        """Views of the rows of a level in x order: its own buckets followed by
+        not yet aggregated buckets of lower levels and raw tail"""
+        parts = [self._levels[level].get()]
+        for k in range(level - 1, -1, -1):
+            parts.append(self._levels[k].get()[self._levels[k + 1].size * self.factor:])
+        if self._tail.shape[0]:
+            parts.append(np.hstack((self._tail, self._tail[:, 1:])))
+        return parts
+
+    def get_level(self, level: int) -> np.ndarray:
+        """Rows [x, mins..., maxs...] covering the whole signal at a level"""
+        parts = self._get_level_parts(level)
+        return np.vstack(parts) if len(parts) > 1 else parts[0]
+
+    def choose_level(self, xmin: float, xmax: float, pixels: int) -> int:
+        """Coarsest level that still has at least one bucket per pixel in [xmin, xmax].
+        -1 means that raw data has few enough points to be drawn directly."""
+        x0 = self._levels[0].get()[:, 0]
+        samples = (np.searchsorted(x0, xmax, side='right') - np.searchsorted(x0, xmin)) * self.base
+        if samples <= 2 * pixels:
+            return -1
+
+        level = 0
+        while level + 1 < self.levels and self._levels[level + 1].size and \
+                samples // self.bucket_size(level + 1) >= pixels:
+            level += 1
+        return level
+
+    def x_to_rows(self, xmin: float, xmax: float):
+        """Approximate source row range [start, stop) covering [xmin, xmax]"""
+        x0 = self._levels[0].get()[:, 0]
+        start = max(0, np.searchsorted(x0, xmin) - 1) * self.base
+        stop = np.searchsorted(x0, xmax, side='right') + 1
+        stop = self.rows() if stop >= x0.shape[0] else stop * self.base
+        return start, stop
+
+    def get_envelope(self, level: int, xmin: float = None, xmax: float = None):
+        """Envelope of a level as a polyline: x and 2D y with min and max of every bucket
+        interleaved, limited to [xmin, xmax] with one bucket margin on both sides.
+        Only the visible slices of the level parts are copied, not the whole level."""
+        parts = self._get_level_parts(level)
+        total = sum(part.shape[0] for part in parts)
+        # части идут подряд по x, поэтому позиция во всём уровне - сумма позиций в частях
+        start, stop = 0, total
+        if xmin is not None:
+            start = max(0, sum(int(np.searchsorted(part[:, 0], xmin)) for part in parts) - 1)
+        if xmax is not None:
+            stop = min(total, sum(int(np.searchsorted(part[:, 0], xmax, side='right')) for part in parts) + 1)
+
+        slices = []
+        offset = 0
+        for part in parts:
+            a, b = max(start - offset, 0), min(stop - offset, part.shape[0])
+            if a < b:
+                slices.append(part[a:b])
+            offset += part.shape[0]
+        if not slices:
+            slices.append(parts[0][:0])
+        arr = np.vstack(slices) if len(slices) > 1 else slices[0]
+
+        x = np.repeat(arr[:, 0], 2)
+        y = np.empty(shape=(2 * arr.shape[0], self.channels))
+        y[0::2] = arr[:, 1:1 + self.channels]
+        y[1::2] = arr[:, 1 + self.channels:]
+        return x, y
+
+    def save(self, path: str, key: str):
+        arrays = {f"level{k}": level.get() for k, level in enumerate(self._levels)}
+        with open(path, 'wb') as f:
+            np.savez(f, key=np.array(key), tail=self._tail,
+                     params=np.array([self.channels, self.base, self.factor, self.levels]), **arrays)
+
+    @staticmethod
+    def load(path: str, key: str):
+        """Pyramid from a sidecar file or None if it is missing or was built for other data"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as f:
+            if str(f['key']) != key:
+                return None
+            channels, base, factor, levels = (int(v) for v in f['params'])
+            pyramid = MinMaxPyramid(channels, base=base, factor=factor, levels=levels)
+            for k in range(levels):
+                pyramid._levels[k].append(f[f"level{k}"])
+            pyramid._tail = f['tail']
+        return pyramid
+
+
+def build_pyramid(blocks, channels: int) -> MinMaxPyramid:
+    pyramid = MinMaxPyramid(channels)
+    for block in blocks:
+        pyramid.extend(block)
+    return pyramid
+
+
+def get_or_build_pyramid(blocks, rows: int, channels: int, source_path: str = None,
+                         extra_key: str = "", use_sidecar: bool = True) -> MinMaxPyramid:
+    """Loads the pyramid from the sidecar of source_path or builds it from blocks of rows
+    [x, channels...] (an array in a list, or a generator of pages) and tries to save it"""
+    if not use_sidecar or source_path is None:
+        return build_pyramid(blocks, channels)
+
+    key = make_cache_key(source_path, extra_key)
+    sidecar = get_sidecar_path(source_path)
+    try:
+        pyramid = MinMaxPyramid.load(sidecar, key)
+        if pyramid is not None and pyramid.rows() == rows and pyramid.channels == channels:
+            return pyramid
+    except Exception as ex:
+        print("Не удалось прочитать кэш графика: ", ex)
+
+    pyramid = build_pyramid(blocks, channels)
+    try:
+        pyramid.save(sidecar, key)
+    except OSError as ex:
+        print("Не удалось сохранить кэш графика: ", ex)
+    return pyramid
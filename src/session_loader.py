@@ -0,0 +1,44 @@
+import h5py
+
+from h5_loader import load_h5_datasets, get_datasets_column_dtypes, get_first_dataset_name
+from h5_paged_source import H5PagedSource
+from plot_pyramid import get_or_build_pyramid
+from timing import stage_timer
+
+
+def _pyramid_key(dataset_names) -> str:
+    return ','.join(dataset_names)
+
+
+def load_h5_session(path: str, dataset_names: list = None, use_sidecar: bool = True, task=None):
+    """Decodes datasets and prepares the plot pyramid.
+    Returns (headers, data, pyramid, native dtypes of the columns)"""
+    if not dataset_names:
+        with h5py.File(path, "r") as f:
+            dataset_names = [get_first_dataset_name(f)]
+
+    headers, data = load_h5_datasets(path, dataset_names, task=task)
+    with stage_timer.measure('pyramid'):
+        pyramid = get_or_build_pyramid([data], data.shape[0], data.shape[1] - 1, path,
+                                       _pyramid_key(dataset_names), use_sidecar)
+    return headers, data, pyramid, get_datasets_column_dtypes(path, dataset_names)
+
+
+def build_source_pyramid(path: str, dataset_name: str = None, use_sidecar: bool = True, task=None):
+    """Plot pyramid of a dataset opened in lazy mode, built page by page with its own file handle"""
+    source = H5PagedSource(path, dataset_name)
+    try:
+        rows, cols = source.shape
+
+        def pages():
+            for start, page in source.iter_pages():
+                if task:
+                    task.check_cancelled()
+                    task.report_progress(start + page.shape[0], rows)
+                yield page
+
+        with stage_timer.measure('pyramid'):
+            return get_or_build_pyramid(pages(), rows, cols - 1, path,
+                                        _pyramid_key([source.dataset_name]), use_sidecar)
+    finally:
+        source.close()
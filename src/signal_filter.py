@@ -0,0 +1,287 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+# отметки времени в файлах - в миллисекундах
+X_UNIT_SECONDS = 0.001
+# ширина переходной полосы фильтров, Гц
+TRANSITION_HZ = 0.5
+# строк в одном куске кэша, строк соседних кусков для каждой стороны и число кусков в кэше
+FILTER_CHUNK_ROWS = 8192
+FILTER_PAD_ROWS = 2048
+FILTER_MAX_CHUNKS = 1024
+# строк в одной ячейке огибающей min/max отфильтрованного сигнала (делитель FILTER_CHUNK_ROWS);
+# вид, где на пиксель приходится больше строк, строится по огибающей, а не по строкам
+FILTER_ENVELOPE_BUCKET = 256
+
+
+def _raised_cosine(freqs: np.ndarray, edge: float, width: float) -> np.ndarray:
+    """0 below edge - width / 2, 1 above edge + width / 2, half a cosine in between"""
+    t = np.clip((freqs - edge) / width + 0.5, 0, 1)
+    return 0.5 - 0.5 * np.cos(np.pi * t)
+
+
+class BandPass:
+    """Zero-phase band-pass in the frequency domain; low or high may be None for a high/low-pass"""
+
+    def __init__(self, low: float = None, high: float = None, transition: float = TRANSITION_HZ):
+        self.low = low
+        self.high = high
+        self.transition = transition
+
+    def key(self) -> tuple:
+        return 'bandpass', self.low, self.high, self.transition
+
+    def response(self, freqs: np.ndarray) -> np.ndarray:
+        gain = np.ones_like(freqs)
+        if self.low:
+            gain *= _raised_cosine(freqs, self.low, self.transition)
+        if self.high:
+            gain *= 1 - _raised_cosine(freqs, self.high, self.transition)
+        return gain
+
+
+class Notch:
+    """Zero-phase band-stop of `width` Hz around freq (mains interference)"""
+
+    def __init__(self, freq: float = 50.0, width: float = 2.0):
+        self.freq = freq
+        self.width = width
+
+    def key(self) -> tuple:
+        return 'notch', self.freq, self.width
+
+    def response(self, freqs: np.ndarray) -> np.ndarray:
+        t = np.clip(np.abs(freqs - self.freq) / (self.width / 2), 0, 1)
+        return 0.5 - 0.5 * np.cos(np.pi * t)
+
+
+class FilterChain:
+    def __init__(self, filters=()):
+        self.filters = tuple(filters)
+
+    def __bool__(self):
+        return bool(self.filters)
+
+    def key(self) -> tuple:
+        return tuple(f.key() for f in self.filters)
+
+    def response(self, freqs: np.ndarray) -> np.ndarray:
+        gain = np.ones_like(freqs)
+        for f in self.filters:
+            gain *= f.response(freqs)
+        return gain
+
+
+def filter_block(values: np.ndarray, sample_rate: float, chain: FilterChain) -> np.ndarray:
+    """Columns of values filtered with one FFT each, same length as the input"""
+    rows = values.shape[0]
+    freqs = np.fft.rfftfreq(rows, d=1 / sample_rate)
+    spectrum = np.fft.rfft(values, axis=0)
+    spectrum *= chain.response(freqs)[:, np.newaxis]
+    return np.fft.irfft(spectrum, n=rows, axis=0)
+
+
+def bucket_envelope(values: np.ndarray, bucket: int):
+    """min and max of every `bucket` rows of values (the last bucket may be shorter)"""
+    starts = np.arange(0, values.shape[0], bucket)
+    return np.minimum.reduceat(values, starts, axis=0), np.maximum.reduceat(values, starts, axis=0)
+
+
+def estimate_sample_rate(x: np.ndarray, x_unit: float = X_UNIT_SECONDS):
+    """Sampling rate in Hz from the median step of the x column or None"""
+    steps = np.diff(x)
+    steps = steps[steps > 0]
+    if not steps.size:
+        return None
+    return 1 / (float(np.median(steps)) * x_unit)
+
+
+class FilteredSignal:
+    """Rows [x, channels...] with a filter chain applied per channel, computed lazily.
+    Rows are split into chunks; a chunk is filtered together with FILTER_PAD_ROWS rows of
+    its neighbours (reflected at the ends of the data) and only its own part is kept, so
+    adjacent chunks join without visible edges. Results are cached by (channel, chain, chunk):
+    changing the filter of one channel recomputes only this channel, and switching back
+    to a previous filter reuses the cache.
+    Besides the filtered rows, every filtered chunk leaves a min/max envelope of `envelope_bucket`
+    rows per cell. Envelopes are small and are not evicted, so zoomed out views are drawn
+    from them without filtering the whole visible range again."""
+
+    def __init__(self, row_reader=None, rows: int = 0, sample_rate: float = None,
+                 chunk_rows: int = FILTER_CHUNK_ROWS, pad_rows: int = FILTER_PAD_ROWS,
+                 max_chunks: int = FILTER_MAX_CHUNKS, envelope_bucket: int = FILTER_ENVELOPE_BUCKET):
+        self.chunk_rows = chunk_rows
+        self.pad_rows = pad_rows
+        self.max_chunks = max_chunks
+        self.envelope_bucket = envelope_bucket
+        self._chains = {}
+        self._cache = OrderedDict()
+        # (channel, chain key, chunk) -> (min, max); (None, None, chunk) -> (x, min, max) исходных колонок
+        self._envelopes = {}
+        # номер данных: огибающие, посчитанные в копии для других данных, не принимаются
+        self._generation = 0
+        self.reset(row_reader, rows, sample_rate)
+
+    def reset(self, row_reader, rows: int, sample_rate: float):
+        """New data: row_reader(start, stop) -> 2D array of source rows"""
+        self._row_reader = row_reader
+        self.rows = rows
+        self.sample_rate = sample_rate
+        self._cache.clear()
+        self._envelopes.clear()
+        self._generation += 1
+
+    def set_rows(self, rows: int):
+        """Rows were appended: chunks that saw the old end of the data are recomputed"""
+        first_dirty = max(0, self.rows - self.pad_rows) // self.chunk_rows
+        for key in [key for key in self._cache if key[2] >= first_dirty]:
+            del self._cache[key]
+        for key in [key for key in self._envelopes if key[2] >= first_dirty]:
+            del self._envelopes[key]
+        self.rows = rows
+
+    def get_chains(self) -> dict:
+        """{column: FilterChain} of the filtered channels"""
+        return dict(self._chains)
+
+    def set_chain(self, channel: int, chain: FilterChain):
+        if chain:
+            self._chains[channel] = chain
+        else:
+            self._chains.pop(channel, None)
+
+    def is_active(self) -> bool:
+        return bool(self._chains) and bool(self.sample_rate) and self._row_reader is not None
+
+    def copy(self) -> "FilteredSignal":
+        """Same data and filters with an own cache, e.g. for an export in a worker"""
+        signal = FilteredSignal(self._row_reader, self.rows, self.sample_rate,
+                                self.chunk_rows, self.pad_rows, self.max_chunks, self.envelope_bucket)
+        signal._chains = dict(self._chains)
+        signal._envelopes = dict(self._envelopes)
+        signal._generation = self._generation
+        return signal
+
+    def _filter_chunk(self, idx: int, channels: list):
+        start = idx * self.chunk_rows
+        stop = min(self.rows, start + self.chunk_rows)
+        low = max(0, start - self.pad_rows)
+        high = min(self.rows, stop + self.pad_rows)
+        raw = self._row_reader(low, high)
+
+        groups = {}
+        for channel in channels:
+            chain = self._chains[channel]
+            groups.setdefault(chain.key(), (chain, []))[1].append(channel)
+
+        own = raw[start - low:stop - low]
+        self._envelopes[(None, None, idx)] = (own[::self.envelope_bucket, 0].copy(),
+                                              *bucket_envelope(own[:, 1:], self.envelope_bucket))
+
+        for key, (chain, group) in groups.items():
+            values = raw[:, group]
+            pad = ((self.pad_rows - (start - low), self.pad_rows - (high - stop)), (0, 0))
+            mode = 'reflect' if values.shape[0] > max(pad[0]) else 'edge'
+            filtered = filter_block(np.pad(values, pad, mode=mode), self.sample_rate, chain)
+            part = filtered[self.pad_rows:self.pad_rows + stop - start]
+            mins, maxs = bucket_envelope(part, self.envelope_bucket)
+            for col, channel in enumerate(group):
+                self._cache[(channel, key, idx)] = part[:, col].copy()
+                self._envelopes[(channel, key, idx)] = (mins[:, col].copy(), maxs[:, col].copy())
+
+        while len(self._cache) > self.max_chunks:
+            self._cache.popitem(last=False)
+
+    def get_rows(self, start: int, stop: int) -> np.ndarray:
+        """Rows [start, stop) with filtered channels; other columns are returned as they are"""
+        stop = min(stop, self.rows)
+        rows = np.array(self._row_reader(start, stop), dtype='float64')
+        if not self.is_active() or stop <= start:
+            return rows
+
+        # фильтры каналов, которых нет в текущих данных, не применяются
+        chains = {channel: chain for channel, chain in self._chains.items() if channel < rows.shape[1]}
+        first, last = start // self.chunk_rows, (stop - 1) // self.chunk_rows
+        # весь запрошенный диапазон должен помещаться в кэш, иначе последовательное чтение его вытесняет
+        self.max_chunks = max(self.max_chunks, (last - first + 1) * len(chains))
+        for idx in range(first, last + 1):
+            missing = []
+            for channel, chain in chains.items():
+                key = (channel, chain.key(), idx)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                else:
+                    missing.append(channel)
+            if missing:
+                self._filter_chunk(idx, missing)
+
+            chunk_start = idx * self.chunk_rows
+            a = max(start, chunk_start)
+            b = min(stop, chunk_start + self.chunk_rows)
+            for channel, chain in chains.items():
+                chunk = self._cache[(channel, chain.key(), idx)]
+                rows[a - start:b - start, channel] = chunk[a - chunk_start:b - chunk_start]
+        return rows
+
+    def _get_chunk_envelopes(self, idx: int, chains: dict):
+        missing = [channel for channel, chain in chains.items()
+                   if (channel, chain.key(), idx) not in self._envelopes]
+        if missing or (None, None, idx) not in self._envelopes:
+            self._filter_chunk(idx, missing)
+        x, mins, maxs = self._envelopes[(None, None, idx)]
+        mins, maxs = mins.copy(), maxs.copy()
+        for channel, chain in chains.items():
+            mins[:, channel - 1], maxs[:, channel - 1] = self._envelopes[(channel, chain.key(), idx)]
+        return x, mins, maxs
+
+    def get_envelope(self, start: int, stop: int):
+        """Envelope of rows [start, stop) as a polyline: x and 2D y with min and max of every
+        `envelope_bucket` rows interleaved, like MinMaxPyramid.get_envelope"""
+        stop = min(stop, self.rows)
+        channels = self._row_reader(0, 1).shape[1]
+        chains = {channel: chain for channel, chain in self._chains.items() if channel < channels}
+        xs, mins, maxs = [], [], []
+        for idx in range(start // self.chunk_rows, (stop - 1) // self.chunk_rows + 1):
+            x, low, high = self._get_chunk_envelopes(idx, chains)
+            # ячейки куска, пересекающиеся с [start, stop)
+            first = idx * self.chunk_rows
+            a = max(0, (start - first) // self.envelope_bucket)
+            b = -(-(stop - first) // self.envelope_bucket)
+            xs.append(x[a:b])
+            mins.append(low[a:b])
+            maxs.append(high[a:b])
+
+        x = np.concatenate(xs) if xs else np.empty(0)
+        y = np.empty(shape=(2 * x.shape[0], channels - 1))
+        if xs:
+            y[0::2] = np.concatenate(mins)
+            y[1::2] = np.concatenate(maxs)
+        return np.repeat(x, 2), y
+
+    def build_envelopes(self, task=None):
+        """Envelopes of all chunks, e.g. in a worker on a copy; the result goes to add_envelopes"""
+        chains = {channel: chain for channel, chain in self._chains.items()
+                  if channel < self._row_reader(0, 1).shape[1]}
+        chunks = -(-self.rows // self.chunk_rows)
+        for idx in range(chunks):
+            if task:
+                task.check_cancelled()
+            self._get_chunk_envelopes(idx, chains)
+            # полные куски здесь не нужны, кэш не должен расти до всего файла
+            self._cache.clear()
+            if task:
+                task.report_progress(idx + 1, chunks)
+        return self._generation, self.rows, self._envelopes
+
+    def add_envelopes(self, built):
+        """Takes envelopes from build_envelopes if they were computed for the same data"""
+        generation, rows, envelopes = built
+        if generation == self._generation and rows == self.rows:
+            self._envelopes.update(envelopes)
+
+    def iter_blocks(self, block_rows: int):
+        """(start row, 2D block) of all filtered rows, like TableDataModel.iter_blocks"""
+        for start in range(0, self.rows, block_rows):
+            yield start, self.get_rows(start, min(self.rows, start + block_rows))
@@ -0,0 +1,79 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+DEFAULT_NPERSEG = 256
+DEFAULT_OVERLAP = 0.5
+# окон в одном куске вычислений и наибольшее число столбцов спектрограммы
+CHUNK_SEGMENTS = 4096
+MAX_SPECTROGRAM_COLUMNS = 4000
+
+
+class Spectrum:
+    """Spectrogram (columns x freqs, power spectral density) and Welch PSD of one channel"""
+
+    def __init__(self, freqs: np.ndarray, times: np.ndarray, spectrogram: np.ndarray, psd: np.ndarray):
+        self.freqs = freqs
+        self.times = times
+        self.spectrogram = spectrogram
+        self.psd = psd
+
+
+def get_spectrum_key(channel: int, nperseg: int, noverlap: int, filter_key=None) -> tuple:
+    return channel, nperseg, noverlap, filter_key
+
+
+def segment_power(values: np.ndarray, window: np.ndarray, step: int, sample_rate: float) -> np.ndarray:
+    """One-sided power spectral density of every window of values taken with `step`,
+    all windows at once through a strided view and one rfft. Returns (segments, freqs)"""
+    segments = sliding_window_view(values, window.shape[0])[::step]
+    # вычитание среднего окна, как detrend='constant'
+    segments = (segments - segments.mean(axis=1, keepdims=True)) * window
+    power = np.abs(np.fft.rfft(segments, axis=1)) ** 2 / (sample_rate * np.sum(window ** 2))
+    if window.shape[0] % 2:
+        power[:, 1:] *= 2
+    else:
+        power[:, 1:-1] *= 2
+    return power
+
+
+def compute_spectrum(row_reader, rows: int, channel: int, sample_rate: float,
+                     nperseg: int = DEFAULT_NPERSEG, noverlap: int = None, task=None) -> Spectrum:
+    """Spectrogram and Welch PSD of a column read through row_reader(start, stop) in chunks
+    of CHUNK_SEGMENTS windows. Neighbouring windows are averaged so that the spectrogram
+    has at most MAX_SPECTROGRAM_COLUMNS columns; the PSD is the mean of all windows."""
+    if noverlap is None:
+        noverlap = int(nperseg * DEFAULT_OVERLAP)
+    step = nperseg - noverlap
+    if step <= 0:
+        raise Exception("Перекрытие должно быть меньше окна")
+    if rows < nperseg:
+        raise Exception("Строк меньше, чем размер окна")
+
+    total = (rows - nperseg) // step + 1
+    group = -(-total // MAX_SPECTROGRAM_COLUMNS)
+    chunk_segments = group * -(-CHUNK_SEGMENTS // group)
+    # периодическое окно Ханна, как в методе Уэлча
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(nperseg) / nperseg)
+
+    columns = []
+    times = []
+    psd = np.zeros(nperseg // 2 + 1)
+    for first in range(0, total, chunk_segments):
+        if task:
+            task.check_cancelled()
+        count = min(chunk_segments, total - first)
+        start = first * step
+        block = row_reader(start, start + (count - 1) * step + nperseg)
+        power = segment_power(block[:, channel], window, step, sample_rate)
+        psd += power.sum(axis=0)
+
+        starts = np.arange(0, count, group)
+        columns.append(np.add.reduceat(power, starts, axis=0) / np.diff(np.append(starts, count))[:, np.newaxis])
+        # x середины первого окна группы
+        times.append(block[starts * step + nperseg // 2, 0])
+        if task:
+            task.report_progress(first + count, total)
+
+    freqs = np.fft.rfftfreq(nperseg, d=1 / sample_rate)
+    return Spectrum(freqs, np.concatenate(times), np.vstack(columns), psd / total)
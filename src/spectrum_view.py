@@ -0,0 +1,85 @@
+import numpy as np
+from PyQt6 import QtWidgets, QtCore
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
+
+from spectral import Spectrum, DEFAULT_NPERSEG, DEFAULT_OVERLAP
+
+
+WINDOW_SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+
+
+class SpectrumView(QtWidgets.QWidget):
+    """Spectrogram (imshow, time x frequency) and Welch PSD of a channel side by side.
+    Computation is requested through compute_requested(channel, nperseg, noverlap)."""
+
+    compute_requested = QtCore.pyqtSignal(int, int, int)
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.comboBoxChannel = QtWidgets.QComboBox()
+        self.comboBoxWindow = QtWidgets.QComboBox()
+        for size in WINDOW_SIZES:
+            self.comboBoxWindow.addItem(str(size), size)
+        self.comboBoxWindow.setCurrentIndex(WINDOW_SIZES.index(DEFAULT_NPERSEG))
+        self.spinBoxOverlap = QtWidgets.QSpinBox()
+        self.spinBoxOverlap.setRange(0, 95)
+        self.spinBoxOverlap.setSuffix(" %")
+        self.spinBoxOverlap.setValue(int(DEFAULT_OVERLAP * 100))
+        self.btnCompute = QtWidgets.QPushButton("Вычислить")
+        self.btnCompute.clicked.connect(self.on_btnCompute_click)
+
+        controls = QtWidgets.QHBoxLayout()
+        for label, widget in (("Канал", self.comboBoxChannel), ("Окно", self.comboBoxWindow),
+                              ("Перекрытие", self.spinBoxOverlap)):
+            controls.addWidget(QtWidgets.QLabel(label))
+            controls.addWidget(widget)
+        controls.addWidget(self.btnCompute)
+        controls.addStretch()
+
+        self._canvas = FigureCanvas(Figure())
+        self._spectrogram_ax, self._psd_ax = self._canvas.figure.subplots(
+            1, 2, sharey=True, gridspec_kw={'width_ratios': [4, 1]})
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(NavigationToolbar(self._canvas, self))
+        layout.addWidget(self._canvas)
+
+    def set_channels(self, headers: dict):
+        current = self.comboBoxChannel.currentData()
+        self.comboBoxChannel.clear()
+        for col, name in headers.items():
+            if col > 0:
+                self.comboBoxChannel.addItem(name, col)
+        index = self.comboBoxChannel.findData(current)
+        if index >= 0:
+            self.comboBoxChannel.setCurrentIndex(index)
+
+    def on_btnCompute_click(self):
+        channel = self.comboBoxChannel.currentData()
+        if channel is None:
+            return
+        nperseg = self.comboBoxWindow.currentData()
+        self.compute_requested.emit(channel, nperseg, nperseg * self.spinBoxOverlap.value() // 100)
+
+    def show_spectrum(self, spectrum: Spectrum, title: str):
+        # мощность в дБ; нулевая мощность заменяется наименьшей положительной
+        tiny = np.finfo('float64').tiny
+        self._spectrogram_ax.cla()
+        self._psd_ax.cla()
+
+        times = spectrum.times
+        right = times[-1] if times.shape[0] > 1 and times[-1] > times[0] else times[0] + 1
+        self._spectrogram_ax.imshow(10 * np.log10(spectrum.spectrogram.T + tiny), origin='lower', aspect='auto',
+                                    interpolation='nearest', cmap='viridis',
+                                    extent=(times[0], right, spectrum.freqs[0], spectrum.freqs[-1]))
+        self._spectrogram_ax.set_title(title)
+        self._spectrogram_ax.set_ylabel("Гц")
+
+        self._psd_ax.plot(10 * np.log10(spectrum.psd + tiny), spectrum.freqs)
+        self._psd_ax.set_title("PSD, дБ")
+        self._psd_ax.grid(True, color="grey", linewidth="0.4", linestyle="-.")
+        self._canvas.draw_idle()
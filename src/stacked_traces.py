@@ -0,0 +1,80 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+
+
+# расстояние между соседними каналами по оси y
+CHANNEL_SPACING = 1.0
+# доля расстояния между каналами, которую занимает размах канала при автоматическом усилении
+AUTO_GAIN_FILL = 0.8
+GAIN_STEP = 1.25
+
+
+class StackedTraces:
+    """All channels as one LineCollection, each channel shifted to its own row:
+    y_plot = (y - center) * gain + offset. Vertices live in one preallocated
+    (channels, points, 2) buffer that is refilled in place for every visible slice,
+    so the cost depends on the number of visible points, not on the number of channels."""
+
+    def __init__(self, ax, labels: list, spacing: float = CHANNEL_SPACING):
+        self._ax = ax
+        self.channels = len(labels)
+        self.spacing = spacing
+        # первый канал сверху
+        self.offsets = (self.channels - 1 - np.arange(self.channels)) * spacing
+        self.centers = np.zeros(self.channels)
+        self.gains = np.ones(self.channels)
+        self._buf = np.empty(shape=(self.channels, 0, 2))
+        self._size = 0
+        self._y = None
+
+        self.collection = LineCollection([], linewidths=0.8,
+                                         colors=[f"C{k % 10}" for k in range(self.channels)])
+        ax.add_collection(self.collection)
+        ax.set_yticks(self.offsets, labels)
+        ax.tick_params(axis='y', labelsize=max(4, min(10, 400 // max(1, self.channels))))
+        ax.set_ylim(-spacing, self.channels * spacing)
+
+    def auto_gain(self, y: np.ndarray):
+        """Centers every channel and scales its range in y to AUTO_GAIN_FILL of the spacing"""
+        low = y.min(axis=0) if y.shape[0] else np.zeros(self.channels)
+        high = y.max(axis=0) if y.shape[0] else np.ones(self.channels)
+        span = high - low
+        self.centers = (high + low) / 2
+        self.gains = np.where(span > 0, AUTO_GAIN_FILL * self.spacing / np.where(span > 0, span, 1), 1.0)
+
+    def channel_at(self, y: float) -> int:
+        """Channel (0-based) whose row is nearest to y"""
+        row = int(round(self.channels - 1 - y / self.spacing))
+        return min(max(row, 0), self.channels - 1)
+
+    def set_gain(self, channel: int, gain: float):
+        self.gains[channel] = gain
+        self._refill()
+
+    def scale_gains(self, factor: float):
+        self.gains *= factor
+        self._refill()
+
+    def _reserve(self, points: int):
+        if points > self._buf.shape[1]:
+            self._buf = np.empty(shape=(self.channels, max(points, int(1.5 * self._buf.shape[1])), 2))
+
+    def set_data(self, x: np.ndarray, y: np.ndarray):
+        """x and 2D y (points, channels) of the visible slice"""
+        points = x.shape[0]
+        self._reserve(points)
+        self._y = y
+        self._size = points
+        self._buf[:, :points, 0] = x
+        self._refill()
+
+    def _refill(self):
+        if not self._size:
+            self.collection.set_segments([])
+            return
+        buf = self._buf[:, :self._size]
+        # (y - center) * gain + offset для всех каналов сразу, в транспонированный вид буфера
+        np.subtract(self._y.T, self.centers[:, np.newaxis], out=buf[:, :, 1])
+        buf[:, :, 1] *= self.gains[:, np.newaxis]
+        buf[:, :, 1] += self.offsets[:, np.newaxis]
+        self.collection.set_segments(list(buf))
@@ -0,0 +1,58 @@
+import argparse
+
+import h5py
+import numpy as np
+
+
+# шаг времени между строками, мс (250 Гц, как в h5_files/session_eeg2.h5)
+SAMPLE_STEP_MS = 4
+WRITE_BLOCK_ROWS = 1 << 20
+
+
+def get_session_dtype(rows: int, channels: int) -> np.dtype:
+    time_type = 'u4' if rows * SAMPLE_STEP_MS < 2 ** 32 else 'u8'
+    return np.dtype([('timestamp', time_type)] + [(f"eeg{k + 1}", 'f4') for k in range(channels)])
+
+
+def make_block(start: int, rows: int, dtype: np.dtype, rng: np.random.Generator) -> np.ndarray:
+    """Rows [start, start + rows): timestamps and per channel alpha rhythm + drift + noise"""
+    block = np.empty(shape=rows, dtype=dtype)
+    t = (start + np.arange(rows)) * SAMPLE_STEP_MS
+    block['timestamp'] = t
+    seconds = t / 1000.0
+    for k, name in enumerate(dtype.names[1:]):
+        signal = 0.05 * np.sin(2 * np.pi * (8 + k) * seconds) + 0.02 * np.sin(2 * np.pi * 0.1 * seconds + k)
+        block[name] = signal + 0.01 * rng.standard_normal(rows)
+    return block
+
+
+def make_session(path: str, rows: int, channels: int = 4, dataset_name: str = 'eeg',
+                 chunk_rows: int = None, compression: str = None, seed: int = 0) -> str:
+    """Writes a synthetic compound-dtype EEG session. chunk_rows=None and no compression
+    give a contiguous dataset (memory-mapped by the loader), otherwise it is chunked."""
+    dtype = get_session_dtype(rows, channels)
+    if compression and not chunk_rows:
+        chunk_rows = 65536
+    chunks = (max(1, min(rows, chunk_rows)),) if chunk_rows else None
+
+    rng = np.random.default_rng(seed)
+    with h5py.File(path, "w") as f:
+        ds = f.create_dataset(dataset_name, shape=(rows,), dtype=dtype, chunks=chunks,
+                              compression=compression, shuffle=bool(compression))
+        for start in range(0, rows, WRITE_BLOCK_ROWS):
+            stop = min(rows, start + WRITE_BLOCK_ROWS)
+            ds[start:stop] = make_block(start, stop - start, dtype, rng)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Синтетический h5 файл сессии ЭЭГ")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=float, default=1e6)
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--dataset', default='eeg')
+    parser.add_argument('--chunk-rows', type=int, default=None, help="без указания - непрерывный набор")
+    parser.add_argument('--compression', choices=('gzip', 'lzf'), default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    make_session(args.path, int(args.rows), args.channels, args.dataset, args.chunk_rows, args.compression, args.seed)
@@ -1,8 +1,30 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
 import numpy as np
 
 from PyQt6 import QtCore
 
-from mark import Mark
+from formatting import format_values
+from mark_index import MarkIndex
+from timing import timed
+
+if TYPE_CHECKING:
+    from h5_paged_source import H5PagedSource
+
+
+# Строк в одной странице кэша отформатированных ячеек и число страниц в кэше
+FORMAT_PAGE_ROWS = 1024
+FORMAT_MAX_PAGES = 32
+
+
+def _reserve(buffer: np.ndarray, used: np.ndarray, rows: int) -> np.ndarray:
+    """buffer if it has room for `rows` rows, else a twice larger one starting with `used`"""
+    if buffer is not None and rows <= buffer.shape[0]:
+        return buffer
+    grown = np.empty(shape=(max(rows, 2 * used.shape[0], FORMAT_PAGE_ROWS),) + used.shape[1:], dtype=used.dtype)
+    grown[:used.shape[0]] = used
+    return grown
 
 
 class TableDataModel(QtCore.QAbstractTableModel):
@@ -10,26 +32,83 @@ class TableDataModel(QtCore.QAbstractTableModel):
         super().__init__(*args, **kwargs)
         self._data = np.empty(shape=0)
         self._headers = {}
-        self._marked_rows: [Mark] = []
+        # номер метки (в порядке MarkIndex) для каждой строки, -1 - нет метки
+        self._mark_idx = np.empty(shape=0, dtype='int32')
+        # ленивый режим: строки читаются страницами из открытого h5 файла
+        self._source: "H5PagedSource | None" = None
+        self._mark_index = MarkIndex()
+        # точность применяется только при отображении и сохранении
+        self._accuracy = None
+        self._formatted_pages = OrderedDict()
+        # исходные типы колонок в h5 файле, для экспорта без потерь
+        self._column_dtypes = []
+        # буферы с запасом для добавления строк; _data и _mark_idx - их начало
+        self._data_buffer = None
+        self._mark_idx_buffer = None
+
+    def is_paged(self) -> bool:
+        return self._source is not None
 
     def get_data(self) -> np.ndarray:
+        # в ленивом режиме - прореженные строки для графика
+        if self._source:
+            return self._source.get_overview()
         return self._data
 
-    def get_marked_data_for_save(self):
-        mark_arr = np.array([np.array([mark.color.name() if mark else ' ']) for mark in self._marked_rows])
-        data = self._data.astype(str)
-        return np.hstack((data, mark_arr))
+    def get_rows(self, start: int, stop: int) -> np.ndarray:
+        if self._source:
+            return self._source.get_rows(start, stop)
+        return self._data[start:stop]
+
+    def x_to_rows(self, xmin: np.ndarray, xmax: np.ndarray) -> tuple:
+        """Row ranges [start, stop) holding all rows with xmin <= x <= xmax of every interval"""
+        if self._source:
+            return self._source.x_to_rows(xmin, xmax)
+        x = self._data[:, 0]
+        return np.searchsorted(x, xmin, side='left'), np.searchsorted(x, xmax, side='right')
+
+    def iter_blocks(self, block_rows: int):
+        """Iterates over all rows as (start row, 2D block) without materializing them"""
+        if self._source:
+            yield from self._source.iter_pages(block_rows)
+            return
+        for start in range(0, self._data.shape[0], block_rows):
+            yield start, self._data[start:start + block_rows]
 
     def get_headers(self):
         return self._headers
 
-    def get_marked_rows(self) -> list:
-        return self._marked_rows
+    def close_source(self):
+        if self._source:
+            self._source.close()
+            self._source = None
+
+    def get_column_dtypes(self) -> list:
+        if len(self._column_dtypes) == self.columnCount():
+            return self._column_dtypes
+        return [np.dtype('float64')] * self.columnCount()
 
-    def set_items(self, items):
+    @timed('model reset')
+    def set_items(self, items, column_dtypes: list = None):
         self.beginResetModel()
+        self.close_source()
         self._data = items
-        self.update_marked_rows(np.empty(shape=0))
+        self._data_buffer = None
+        self._column_dtypes = column_dtypes or []
+        self._formatted_pages.clear()
+        self._set_mark_index(MarkIndex())
+        self.endResetModel()
+
+    @timed('model reset')
+    def set_source(self, source: "H5PagedSource"):
+        self.beginResetModel()
+        self.close_source()
+        self._data = np.empty(shape=0)
+        self._source = source
+        self._column_dtypes = source.get_column_dtypes()
+        self._formatted_pages.clear()
+        self._headers = source.get_headers()
+        self._set_mark_index(MarkIndex())
         self.endResetModel()
 
     def set_headers(self, headers):
@@ -37,25 +116,86 @@ class TableDataModel(QtCore.QAbstractTableModel):
         self._headers = headers
         self.endResetModel()
 
-    def update_marked_rows(self, marks: np.ndarray):
+    def _set_mark_index(self, mark_index: MarkIndex):
+        self._mark_index = mark_index
+        self._mark_idx_buffer = None
+        if self._source:
+            # метка строки вычисляется при отображении по значению из страницы
+            self._mark_idx = np.empty(shape=0, dtype='int32')
+        elif self._data.size:
+            self._mark_idx = mark_index.assign(self._data[:, 0])
+        else:
+            self._mark_idx = np.empty(shape=0, dtype='int32')
+
+    @timed('marked rows')
+    def update_marked_rows(self, mark_index: MarkIndex):
         self.beginResetModel()
-        self._marked_rows = [None] * self._data.shape[0]
+        self._set_mark_index(mark_index)
+        self.endResetModel()
+
+    @timed('append rows')
+    def append_items(self, block: np.ndarray):
+        """Appends rows to the end with beginInsertRows instead of a reset. Rows are copied
+        into a buffer with spare room, so only the new rows are copied, marked and formatted"""
+        if self._source:
+            raise Exception("Добавление строк недоступно в ленивом режиме")
+        if not block.shape[0]:
+            return
+
+        data = self._data if self._data.size else np.empty(shape=(0, block.shape[1]))
+        old_rows = data.shape[0]
+        rows = old_rows + block.shape[0]
+
+        self.beginInsertRows(QtCore.QModelIndex(), old_rows, rows - 1)
+        self._data_buffer = _reserve(self._data_buffer, data, rows)
+        self._data_buffer[old_rows:rows] = block
+        self._data = self._data_buffer[:rows]
+
+        self._mark_idx_buffer = _reserve(self._mark_idx_buffer, self._mark_idx[:old_rows], rows)
+        self._mark_idx_buffer[old_rows:rows] = self._mark_index.assign(block[:, 0])
+        self._mark_idx = self._mark_idx_buffer[:rows]
 
-        for idx, row_arr in enumerate(self._data):
-            for mark in marks:
-                if mark.xmin <= row_arr[0] <= mark.xmax:
-                    self._marked_rows[idx] = mark
-                    break
+        # последняя страница была неполной
+        self._formatted_pages.pop(old_rows // FORMAT_PAGE_ROWS, None)
+        self.endInsertRows()
 
+    def get_accuracy(self):
+        return self._accuracy
+
+    def set_accuracy(self, accuracy: int):
+        self.beginResetModel()
+        self._accuracy = accuracy
+        self._formatted_pages.clear()
         self.endResetModel()
 
-    def around_data(self, accuracy: int):
-        np.around(self._data, accuracy, out=self._data)
+    def _page_rows(self) -> int:
+        return self._source.page_rows if self._source else FORMAT_PAGE_ROWS
+
+    def _get_formatted_page(self, page_idx: int) -> np.ndarray:
+        page = self._formatted_pages.get(page_idx)
+        if page is not None:
+            self._formatted_pages.move_to_end(page_idx)
+            return page
+
+        if self._source:
+            values = self._source.get_page(page_idx)
+        else:
+            values = self._data[page_idx * FORMAT_PAGE_ROWS:(page_idx + 1) * FORMAT_PAGE_ROWS]
+        page = format_values(values, self._accuracy)
+
+        self._formatted_pages[page_idx] = page
+        if len(self._formatted_pages) > FORMAT_MAX_PAGES:
+            self._formatted_pages.popitem(last=False)
+        return page
 
     def rowCount(self, *args, **kwargs) -> int:
+        if self._source:
+            return self._source.shape[0]
         return len(self._data)
 
     def columnCount(self, *args, **kwargs) -> int:
+        if self._source:
+            return self._source.shape[1]
         if len(self._data) > 0:
             return len(self._data[0])
         return 0
@@ -65,11 +205,15 @@ class TableDataModel(QtCore.QAbstractTableModel):
             return
 
         if role == QtCore.Qt.ItemDataRole.DisplayRole:
-            value = self._data[index.row(), index.column()]
-            return str(value)
+            page_rows = self._page_rows()
+            return str(self._get_formatted_page(index.row() // page_rows)[index.row() % page_rows, index.column()])
 
         if role == QtCore.Qt.ItemDataRole.BackgroundRole:
-            mark = self._marked_rows[index.row()]
+            if self._source:
+                mark = self._mark_index.find(self._source.get_value(index.row(), 0))
+            else:
+                idx = self._mark_idx[index.row()]
+                mark = self._mark_index.marks[idx] if idx >= 0 else None
             if mark:
                 return QtCore.QVariant(mark.color)
 
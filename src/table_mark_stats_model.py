@@ -0,0 +1,104 @@
+import numpy as np
+
+from PyQt6 import QtCore
+
+from mark_index import MarkIndex
+from mark_stats import MarkStats
+from timing import timed
+
+
+STATS_HEADERS = ["Начало", "Конец", "Отсчётов", "Среднее", "СКО", "Мин", "Макс", "RMS"]
+STATS_COLUMNS = ('mean', 'std', 'min', 'max', 'rms')
+
+
+class TableMarkStatsModel(QtCore.QAbstractTableModel):
+    """Statistics of every mark for one channel; rows follow the order of the marks table"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats = MarkStats()
+        self._x = np.empty(shape=0)
+        self._values = np.empty(shape=(0, 0))
+        # номер колонки данных, 1 - первый канал
+        self._channel = 1
+
+    def set_data(self, data: np.ndarray, mark_index: MarkIndex):
+        """New data (x in the first column): all marks are computed anew"""
+        if data.ndim == 2 and data.shape[0]:
+            self._x = data[:, 0]
+            self._values = data[:, 1:]
+        else:
+            self._x = np.empty(shape=0)
+            self._values = np.empty(shape=(0, 0))
+        self.reset(mark_index)
+
+    @timed('mark stats')
+    def reset(self, mark_index: MarkIndex):
+        self.beginResetModel()
+        self._stats.reset(mark_index, self._x, self._values)
+        self.endResetModel()
+
+    @timed('mark stats')
+    def sync(self, mark_index: MarkIndex):
+        """Marks were added, removed or edited; others keep their values"""
+        self.beginResetModel()
+        self._stats.sync(mark_index, self._x, self._values)
+        self.endResetModel()
+
+    def clear(self, channels: int):
+        """Drops all values, e.g. before they are computed by a worker in lazy mode"""
+        self.beginResetModel()
+        self._x = np.empty(shape=0)
+        self._values = np.empty(shape=(0, channels))
+        self._stats.clear(channels)
+        self.endResetModel()
+
+    def get_pending(self, mark_index: MarkIndex) -> np.ndarray:
+        """Positions of the marks without up to date values"""
+        return self._stats.get_pending(mark_index)
+
+    def merge(self, mark_index: MarkIndex, positions: np.ndarray, computed: dict):
+        """Values of the marks at positions computed elsewhere (see MarkStats.merge)"""
+        self.beginResetModel()
+        self._stats.merge(mark_index, positions, computed)
+        self.endResetModel()
+
+    def set_channel(self, channel: int):
+        self._channel = channel
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, 2), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    def get_stats(self) -> MarkStats:
+        return self._stats
+
+    def rowCount(self, *args, **kwargs) -> int:
+        return len(self._stats)
+
+    def columnCount(self, *args, **kwargs) -> int:
+        return len(STATS_HEADERS)
+
+    def data(self, index: QtCore.QModelIndex, role: QtCore.Qt.ItemDataRole):
+        if not index.isValid():
+            return
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            row, col = index.row(), index.column()
+            mark = self._stats.marks[row]
+            if col == 0:
+                return "{0:0.2f}".format(mark.xmin)
+            if col == 1:
+                return "{0:0.2f}".format(mark.xmax)
+            if col == 2:
+                return str(self._stats.stats['count'][row])
+            values = self._stats.stats[STATS_COLUMNS[col - 3]]
+            if not 0 < self._channel <= values.shape[1]:
+                return ""
+            return "{0:.4g}".format(values[row, self._channel - 1])
+
+        if role == QtCore.Qt.ItemDataRole.BackgroundRole and index.column() < 2:
+            return QtCore.QVariant(self._stats.marks[index.row()].color)
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: QtCore.Qt.ItemDataRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if orientation == QtCore.Qt.Orientation.Horizontal:
+                return STATS_HEADERS[section]
@@ -3,59 +3,69 @@ import numpy as np
 from PyQt6 import QtCore
 
 from mark import Mark
+from mark_index import MarkIndex
 
 
 class TableMarksModel(QtCore.QAbstractTableModel):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._marks = np.empty(shape=0)
+        # метки отсортированы по xmin
+        self._index = MarkIndex()
 
     def get_marks(self):
-        return self._marks
+        return self._index.marks
+
+    def get_index(self) -> MarkIndex:
+        return self._index
 
     def get_mark(self, idx: int) -> Mark:
-        return self._marks[idx]
+        return self._index.marks[idx]
 
     def set_marks(self, marks):
         self.beginResetModel()
-        self._marks = marks
+        self._index.set_marks(marks)
         self.endResetModel()
 
     def add_mark(self, mark: Mark):
+        pos = int(np.searchsorted(self._index.xmin, mark.xmin, side='right'))
+        self.beginInsertRows(QtCore.QModelIndex(), pos, pos)
+        self._index.insert(mark)
+        self.endInsertRows()
+
+    def update_mark(self, mark: Mark):
+        """Re-sorts the marks after the mark was edited in place"""
         self.beginResetModel()
-        self._marks = np.append(self._marks, mark)
+        self._index.rebuild()
         self.endResetModel()
 
     def have_collisions(self, new_mark: Mark) -> bool:
-        result = False
-        for mark in self._marks:
-            if not (new_mark.xmax <= mark.xmin or mark.xmax <= new_mark.xmin):
-                result = True
-        return result
+        return self._index.has_collision(new_mark.xmin, new_mark.xmax)
 
     def rowCount(self, *args, **kwargs) -> int:
-        return len(self._marks)
+        return len(self._index)
 
     def columnCount(self, *args, **kwargs) -> int:
         # вывод в одну колонку
         return 1
 
     def delete_mark(self, item):
-        self.set_marks(np.delete(self._marks, item.row()))
+        self.beginRemoveRows(QtCore.QModelIndex(), item.row(), item.row())
+        self._index.remove_at(item.row())
+        self.endRemoveRows()
 
     def delete_marks(self):
-        self.set_marks(np.empty(shape=0))
+        self.set_marks([])
 
     def data(self, index: QtCore.QModelIndex, role: QtCore.Qt.ItemDataRole):
         if not index.isValid():
             return
 
         if role == QtCore.Qt.ItemDataRole.DisplayRole:
-            item = self._marks[index.row()]
+            item = self._index.marks[index.row()]
             return "{0:0.2f}  |  ".format(item.xmin) + "{0:0.2f}".format(item.xmax)
 
         if role == QtCore.Qt.ItemDataRole.BackgroundRole:
-            mark = self._marks[index.row()]
+            mark = self._index.marks[index.row()]
             return QtCore.QVariant(mark.color)
 
     def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: QtCore.Qt.ItemDataRole):
@@ -0,0 +1,130 @@
+import cProfile
+import functools
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+
+# путь .prof файла: python main.py --profile [file.prof] или переменная окружения
+PROFILE_ENV = "H5_VISUALIZER_PROFILE"
+PROFILE_FLAG = "--profile"
+DEFAULT_PROFILE_PATH = "h5_visualizer.prof"
+
+
+class StageTimer:
+    """Last, total and count of durations of named stages (read, decode, draw...).
+    Listeners are called as listener(name, seconds) in the thread that measured
+    the stage, so GUI listeners should pass the value on through a queued signal."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._listeners = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            last, total, count = self._stages.get(name, (0.0, 0.0, 0))
+            self._stages[name] = (seconds, total + seconds, count + 1)
+        for listener in self._listeners:
+            listener(name, seconds)
+
+    @contextmanager
+    def measure(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def get_stages(self) -> list:
+        """[(name, last seconds, mean seconds, count)] in the order stages first ran"""
+        with self._lock:
+            return [(name, last, total / count, count) for name, (last, total, count) in self._stages.items()]
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+stage_timer = StageTimer()
+
+
+def timed(name: str):
+    """Decorator measuring every call of a function as a stage of stage_timer"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer.measure(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SessionProfiler:
+    """cProfile of the GUI thread plus every background task, merged into one .prof file.
+    Before Python 3.12 a profile sees only its own thread, so every task gets its own one"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._main = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def run(self, fn):
+        self._main.enable()
+        try:
+            return fn()
+        finally:
+            self._main.disable()
+            self.dump()
+
+    def run_thread(self, fn, *args, **kwargs):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # с Python 3.12 активен только один профилировщик на процесс,
+            # и профиль GUI потока уже видит все потоки
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._threads.append(profile)
+
+    def dump(self):
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            for profile in self._threads:
+                stats.add(profile)
+        stats.dump_stats(self.path)
+        print("Профиль сохранён: ", os.path.abspath(self.path))
+
+
+_profiler: SessionProfiler = None
+
+
+def get_profile_path(argv: list):
+    """.prof path from the --profile flag (with an optional path) or the environment, else None"""
+    if PROFILE_FLAG in argv:
+        pos = argv.index(PROFILE_FLAG)
+        if pos + 1 < len(argv) and not argv[pos + 1].startswith('-'):
+            return argv[pos + 1]
+        return DEFAULT_PROFILE_PATH
+    return os.environ.get(PROFILE_ENV) or None
+
+
+def start_profiler(path: str) -> SessionProfiler:
+    global _profiler
+    _profiler = SessionProfiler(path)
+    return _profiler
+
+
+def get_profiler() -> SessionProfiler:
+    return _profiler
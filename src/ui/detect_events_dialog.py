@@ -0,0 +1,88 @@
+# Form implementation generated from reading ui file '.\detect_events_dialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(360, 280)
+        self.gridLayout = QtWidgets.QGridLayout(Dialog)
+        self.gridLayout.setObjectName("gridLayout")
+        self.label = QtWidgets.QLabel(parent=Dialog)
+        self.label.setObjectName("label")
+        self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
+        self.comboBoxChannel = QtWidgets.QComboBox(parent=Dialog)
+        self.comboBoxChannel.setObjectName("comboBoxChannel")
+        self.gridLayout.addWidget(self.comboBoxChannel, 0, 1, 1, 2)
+        self.label_2 = QtWidgets.QLabel(parent=Dialog)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout.addWidget(self.label_2, 1, 0, 1, 1)
+        self.comboBoxRule = QtWidgets.QComboBox(parent=Dialog)
+        self.comboBoxRule.setObjectName("comboBoxRule")
+        self.gridLayout.addWidget(self.comboBoxRule, 1, 1, 1, 2)
+        self.label_3 = QtWidgets.QLabel(parent=Dialog)
+        self.label_3.setObjectName("label_3")
+        self.gridLayout.addWidget(self.label_3, 2, 0, 1, 1)
+        self.spinBoxThreshold = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxThreshold.setDecimals(4)
+        self.spinBoxThreshold.setMinimum(-1000000000.0)
+        self.spinBoxThreshold.setMaximum(1000000000.0)
+        self.spinBoxThreshold.setObjectName("spinBoxThreshold")
+        self.gridLayout.addWidget(self.spinBoxThreshold, 2, 1, 1, 2)
+        self.checkBoxBelow = QtWidgets.QCheckBox(parent=Dialog)
+        self.checkBoxBelow.setObjectName("checkBoxBelow")
+        self.gridLayout.addWidget(self.checkBoxBelow, 3, 1, 1, 2)
+        self.label_4 = QtWidgets.QLabel(parent=Dialog)
+        self.label_4.setObjectName("label_4")
+        self.gridLayout.addWidget(self.label_4, 4, 0, 1, 1)
+        self.spinBoxWindow = QtWidgets.QSpinBox(parent=Dialog)
+        self.spinBoxWindow.setMinimum(1)
+        self.spinBoxWindow.setMaximum(1000000)
+        self.spinBoxWindow.setProperty("value", 50)
+        self.spinBoxWindow.setObjectName("spinBoxWindow")
+        self.gridLayout.addWidget(self.spinBoxWindow, 4, 1, 1, 2)
+        self.label_5 = QtWidgets.QLabel(parent=Dialog)
+        self.label_5.setObjectName("label_5")
+        self.gridLayout.addWidget(self.label_5, 5, 0, 1, 1)
+        self.spinBoxMergeGap = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxMergeGap.setMaximum(1000000000.0)
+        self.spinBoxMergeGap.setObjectName("spinBoxMergeGap")
+        self.gridLayout.addWidget(self.spinBoxMergeGap, 5, 1, 1, 2)
+        self.label_6 = QtWidgets.QLabel(parent=Dialog)
+        self.label_6.setObjectName("label_6")
+        self.gridLayout.addWidget(self.label_6, 6, 0, 1, 1)
+        self.spinBoxMinDuration = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxMinDuration.setMaximum(1000000000.0)
+        self.spinBoxMinDuration.setObjectName("spinBoxMinDuration")
+        self.gridLayout.addWidget(self.spinBoxMinDuration, 6, 1, 1, 2)
+        self.btnAdd = QtWidgets.QPushButton(parent=Dialog)
+        self.btnAdd.setObjectName("btnAdd")
+        self.gridLayout.addWidget(self.btnAdd, 7, 2, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(46, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        self.gridLayout.addItem(spacerItem, 7, 1, 1, 1)
+        self.btnCancel = QtWidgets.QPushButton(parent=Dialog)
+        self.btnCancel.setObjectName("btnCancel")
+        self.gridLayout.addWidget(self.btnCancel, 7, 0, 1, 1)
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Поиск событий"))
+        self.label.setText(_translate("Dialog", "Канал"))
+        self.label_2.setText(_translate("Dialog", "Правило"))
+        self.label_3.setText(_translate("Dialog", "Порог"))
+        self.checkBoxBelow.setText(_translate("Dialog", "Ниже порога"))
+        self.label_4.setText(_translate("Dialog", "Окно RMS, отсчётов"))
+        self.label_5.setText(_translate("Dialog", "Объединять через"))
+        self.label_6.setText(_translate("Dialog", "Мин. длительность"))
+        self.btnAdd.setText(_translate("Dialog", "Найти"))
+        self.btnCancel.setText(_translate("Dialog", "Отмена"))
@@ -12,7 +12,7 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 class Ui_Dialog(object):
     def setupUi(self, Dialog):
         Dialog.setObjectName("Dialog")
-        Dialog.resize(407, 142)
+        Dialog.resize(407, 195)
         self.gridLayout = QtWidgets.QGridLayout(Dialog)
         self.gridLayout.setObjectName("gridLayout")
         self.label_2 = QtWidgets.QLabel(parent=Dialog)
@@ -26,15 +26,21 @@ class Ui_Dialog(object):
         self.gridLayout.addWidget(self.txtCsvDelimeter, 1, 0, 1, 3)
         self.btnAdd = QtWidgets.QPushButton(parent=Dialog)
         self.btnAdd.setObjectName("btnAdd")
-        self.gridLayout.addWidget(self.btnAdd, 4, 2, 1, 1)
+        self.gridLayout.addWidget(self.btnAdd, 6, 2, 1, 1)
         spacerItem = QtWidgets.QSpacerItem(46, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
-        self.gridLayout.addItem(spacerItem, 4, 1, 1, 1)
+        self.gridLayout.addItem(spacerItem, 6, 1, 1, 1)
         self.btnCancel = QtWidgets.QPushButton(parent=Dialog)
         self.btnCancel.setObjectName("btnCancel")
-        self.gridLayout.addWidget(self.btnCancel, 4, 0, 1, 1)
+        self.gridLayout.addWidget(self.btnCancel, 6, 0, 1, 1)
         self.txtCsvAccuracy = QtWidgets.QLineEdit(parent=Dialog)
         self.txtCsvAccuracy.setObjectName("txtCsvAccuracy")
         self.gridLayout.addWidget(self.txtCsvAccuracy, 3, 0, 1, 3)
+        self.chkPyramidSidecar = QtWidgets.QCheckBox(parent=Dialog)
+        self.chkPyramidSidecar.setObjectName("chkPyramidSidecar")
+        self.gridLayout.addWidget(self.chkPyramidSidecar, 4, 0, 1, 3)
+        self.chkMarksInSource = QtWidgets.QCheckBox(parent=Dialog)
+        self.chkMarksInSource.setObjectName("chkMarksInSource")
+        self.gridLayout.addWidget(self.chkMarksInSource, 5, 0, 1, 3)
 
         self.retranslateUi(Dialog)
         QtCore.QMetaObject.connectSlotsByName(Dialog)
@@ -46,3 +52,5 @@ class Ui_Dialog(object):
         self.label.setText(_translate("Dialog", "Количество цифр после запятой в csv файле"))
         self.btnAdd.setText(_translate("Dialog", "Изменить"))
         self.btnCancel.setText(_translate("Dialog", "Отмена"))
+        self.chkPyramidSidecar.setText(_translate("Dialog", "Сохранять кэш графика рядом с файлом (.pyramid.npz)"))
+        self.chkMarksInSource.setText(_translate("Dialog", "Сохранять метки в исходный h5 файл, а не в файл рядом (.marks.h5)"))
@@ -0,0 +1,73 @@
+# Form implementation generated from reading ui file '.\filters_dialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(407, 240)
+        self.gridLayout = QtWidgets.QGridLayout(Dialog)
+        self.gridLayout.setObjectName("gridLayout")
+        self.label = QtWidgets.QLabel(parent=Dialog)
+        self.label.setObjectName("label")
+        self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
+        self.comboBoxChannel = QtWidgets.QComboBox(parent=Dialog)
+        self.comboBoxChannel.setObjectName("comboBoxChannel")
+        self.gridLayout.addWidget(self.comboBoxChannel, 0, 1, 1, 2)
+        self.checkBoxBandPass = QtWidgets.QCheckBox(parent=Dialog)
+        self.checkBoxBandPass.setObjectName("checkBoxBandPass")
+        self.gridLayout.addWidget(self.checkBoxBandPass, 1, 0, 1, 1)
+        self.spinBoxLow = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxLow.setMaximum(100000.0)
+        self.spinBoxLow.setProperty("value", 1.0)
+        self.spinBoxLow.setObjectName("spinBoxLow")
+        self.gridLayout.addWidget(self.spinBoxLow, 1, 1, 1, 1)
+        self.spinBoxHigh = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxHigh.setMaximum(100000.0)
+        self.spinBoxHigh.setProperty("value", 40.0)
+        self.spinBoxHigh.setObjectName("spinBoxHigh")
+        self.gridLayout.addWidget(self.spinBoxHigh, 1, 2, 1, 1)
+        self.checkBoxNotch = QtWidgets.QCheckBox(parent=Dialog)
+        self.checkBoxNotch.setObjectName("checkBoxNotch")
+        self.gridLayout.addWidget(self.checkBoxNotch, 2, 0, 1, 1)
+        self.spinBoxNotch = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxNotch.setMaximum(100000.0)
+        self.spinBoxNotch.setProperty("value", 50.0)
+        self.spinBoxNotch.setObjectName("spinBoxNotch")
+        self.gridLayout.addWidget(self.spinBoxNotch, 2, 1, 1, 1)
+        self.spinBoxNotchWidth = QtWidgets.QDoubleSpinBox(parent=Dialog)
+        self.spinBoxNotchWidth.setMinimum(0.1)
+        self.spinBoxNotchWidth.setProperty("value", 2.0)
+        self.spinBoxNotchWidth.setObjectName("spinBoxNotchWidth")
+        self.gridLayout.addWidget(self.spinBoxNotchWidth, 2, 2, 1, 1)
+        self.labelSampleRate = QtWidgets.QLabel(parent=Dialog)
+        self.labelSampleRate.setText("")
+        self.labelSampleRate.setObjectName("labelSampleRate")
+        self.gridLayout.addWidget(self.labelSampleRate, 3, 0, 1, 3)
+        self.btnAdd = QtWidgets.QPushButton(parent=Dialog)
+        self.btnAdd.setObjectName("btnAdd")
+        self.gridLayout.addWidget(self.btnAdd, 4, 2, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(46, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        self.gridLayout.addItem(spacerItem, 4, 1, 1, 1)
+        self.btnCancel = QtWidgets.QPushButton(parent=Dialog)
+        self.btnCancel.setObjectName("btnCancel")
+        self.gridLayout.addWidget(self.btnCancel, 4, 0, 1, 1)
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Фильтры каналов"))
+        self.label.setText(_translate("Dialog", "Канал"))
+        self.checkBoxBandPass.setText(_translate("Dialog", "Полосовой фильтр, Гц"))
+        self.checkBoxNotch.setText(_translate("Dialog", "Режекторный фильтр, Гц"))
+        self.btnAdd.setText(_translate("Dialog", "Применить"))
+        self.btnCancel.setText(_translate("Dialog", "Отмена"))
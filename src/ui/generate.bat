@@ -2,4 +2,7 @@
 
 pyuic6 .\main_window.ui -o main_window.py
 pyuic6 .\edit_settings_dialog.ui -o edit_settings_dialog.py
-pyuic6 .\edit_mark_dialog.ui -o edit_mark_dialog.py
\ No newline at end of file
+pyuic6 .\edit_mark_dialog.ui -o edit_mark_dialog.py
+pyuic6 .\h5_browser_dialog.ui -o h5_browser_dialog.py
+pyuic6 .\filters_dialog.ui -o filters_dialog.py
+pyuic6 .\detect_events_dialog.ui -o detect_events_dialog.py
\ No newline at end of file
@@ -0,0 +1,48 @@
+# Form implementation generated from reading ui file '.\h5_browser_dialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(720, 460)
+        self.gridLayout = QtWidgets.QGridLayout(Dialog)
+        self.gridLayout.setObjectName("gridLayout")
+        self.treeItems = QtWidgets.QTreeWidget(parent=Dialog)
+        self.treeItems.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.treeItems.setColumnCount(5)
+        self.treeItems.setObjectName("treeItems")
+        self.gridLayout.addWidget(self.treeItems, 0, 0, 1, 3)
+        self.checkBoxLazy = QtWidgets.QCheckBox(parent=Dialog)
+        self.checkBoxLazy.setObjectName("checkBoxLazy")
+        self.gridLayout.addWidget(self.checkBoxLazy, 1, 0, 1, 3)
+        self.btnCancel = QtWidgets.QPushButton(parent=Dialog)
+        self.btnCancel.setObjectName("btnCancel")
+        self.gridLayout.addWidget(self.btnCancel, 2, 0, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(46, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        self.gridLayout.addItem(spacerItem, 2, 1, 1, 1)
+        self.btnOpen = QtWidgets.QPushButton(parent=Dialog)
+        self.btnOpen.setObjectName("btnOpen")
+        self.gridLayout.addWidget(self.btnOpen, 2, 2, 1, 1)
+
+        self.retranslateUi(Dialog)
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Содержимое h5 файла"))
+        self.treeItems.headerItem().setText(0, _translate("Dialog", "Имя"))
+        self.treeItems.headerItem().setText(1, _translate("Dialog", "Размер"))
+        self.treeItems.headerItem().setText(2, _translate("Dialog", "Тип"))
+        self.treeItems.headerItem().setText(3, _translate("Dialog", "Чанки"))
+        self.treeItems.headerItem().setText(4, _translate("Dialog", "Сжатие"))
+        self.checkBoxLazy.setText(_translate("Dialog", "Ленивый режим (только один набор данных)"))
+        self.btnCancel.setText(_translate("Dialog", "Отмена"))
+        self.btnOpen.setText(_translate("Dialog", "Открыть"))
@@ -83,9 +83,43 @@ class Ui_MainWindow(object):
         self.menuActionSettings.setObjectName("menuActionSettings")
         self.menuActionEditSettings = QtGui.QAction(parent=MainWindow)
         self.menuActionEditSettings.setObjectName("menuActionEditSettings")
+        self.menuActionOpen_h5_lazy = QtGui.QAction(parent=MainWindow)
+        self.menuActionOpen_h5_lazy.setObjectName("menuActionOpen_h5_lazy")
+        self.menuActionOpen_h5_browse = QtGui.QAction(parent=MainWindow)
+        self.menuActionOpen_h5_browse.setObjectName("menuActionOpen_h5_browse")
+        self.menuActionSave_binary = QtGui.QAction(parent=MainWindow)
+        self.menuActionSave_binary.setObjectName("menuActionSave_binary")
+        self.menuActionSave_marks = QtGui.QAction(parent=MainWindow)
+        self.menuActionSave_marks.setObjectName("menuActionSave_marks")
+        self.menuActionLoad_marks = QtGui.QAction(parent=MainWindow)
+        self.menuActionLoad_marks.setObjectName("menuActionLoad_marks")
+        self.menuActionTimings = QtGui.QAction(parent=MainWindow)
+        self.menuActionTimings.setObjectName("menuActionTimings")
+        self.menuActionFollow_h5 = QtGui.QAction(parent=MainWindow)
+        self.menuActionFollow_h5.setCheckable(True)
+        self.menuActionFilters = QtGui.QAction(parent=MainWindow)
+        self.menuActionFilters.setObjectName("menuActionFilters")
+        self.menuActionSpectrum = QtGui.QAction(parent=MainWindow)
+        self.menuActionSpectrum.setObjectName("menuActionSpectrum")
+        self.menuActionMarkStats = QtGui.QAction(parent=MainWindow)
+        self.menuActionMarkStats.setObjectName("menuActionMarkStats")
+        self.menuActionDetectEvents = QtGui.QAction(parent=MainWindow)
+        self.menuActionDetectEvents.setObjectName("menuActionDetectEvents")
+        self.menuActionFollow_h5.setObjectName("menuActionFollow_h5")
         self.menuFile.addAction(self.menuActionOpen_h5)
+        self.menuFile.addAction(self.menuActionOpen_h5_lazy)
+        self.menuFile.addAction(self.menuActionOpen_h5_browse)
+        self.menuFile.addAction(self.menuActionFollow_h5)
         self.menuFile.addAction(self.menuActionSave_csv)
+        self.menuFile.addAction(self.menuActionSave_binary)
+        self.menuFile.addAction(self.menuActionSave_marks)
+        self.menuFile.addAction(self.menuActionLoad_marks)
+        self.menuFile.addAction(self.menuActionDetectEvents)
         self.menuOptions.addAction(self.menuActionEditSettings)
+        self.menuOptions.addAction(self.menuActionFilters)
+        self.menuOptions.addAction(self.menuActionSpectrum)
+        self.menuOptions.addAction(self.menuActionMarkStats)
+        self.menuOptions.addAction(self.menuActionTimings)
         self.menubar.addAction(self.menuFile.menuAction())
         self.menubar.addAction(self.menuOptions.menuAction())
 
@@ -104,3 +138,14 @@ class Ui_MainWindow(object):
         self.menuActionSave_csv.setText(_translate("MainWindow", "Save csv"))
         self.menuActionSettings.setText(_translate("MainWindow", "Settings"))
         self.menuActionEditSettings.setText(_translate("MainWindow", "Settings"))
+        self.menuActionOpen_h5_lazy.setText(_translate("MainWindow", "Open h5 (lazy)"))
+        self.menuActionOpen_h5_browse.setText(_translate("MainWindow", "Open h5 (browse)"))
+        self.menuActionSave_binary.setText(_translate("MainWindow", "Save h5/npy/parquet"))
+        self.menuActionSave_marks.setText(_translate("MainWindow", "Save marks"))
+        self.menuActionLoad_marks.setText(_translate("MainWindow", "Load marks"))
+        self.menuActionTimings.setText(_translate("MainWindow", "Timings"))
+        self.menuActionFollow_h5.setText(_translate("MainWindow", "Follow h5 (live)"))
+        self.menuActionFilters.setText(_translate("MainWindow", "Filters"))
+        self.menuActionSpectrum.setText(_translate("MainWindow", "Spectrum"))
+        self.menuActionMarkStats.setText(_translate("MainWindow", "Mark statistics"))
+        self.menuActionDetectEvents.setText(_translate("MainWindow", "Detect events"))
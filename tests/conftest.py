@@ -0,0 +1,5 @@
+import os
+import sys
+
+# модули приложения импортируются без пакета, как при запуске из src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
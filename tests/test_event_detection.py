@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from event_detection import EventRules, EventDetector, detect_events, merge_intervals
+
+
+def _data(rows=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack((np.arange(rows) * 0.25, rng.normal(size=rows).cumsum() * 0.1, rng.normal(size=rows)))
+
+
+@pytest.mark.parametrize('rule, threshold, window', [
+    (EventRules.threshold, 0.5, 1),
+    (EventRules.derivative, 2.5, 1),
+    (EventRules.rms, 1.2, 25),
+])
+def test_events_do_not_depend_on_chunk_size(rule, threshold, window):
+    data = _data()
+
+    def reader(start, stop):
+        return data[start:stop]
+
+    expected = detect_events(reader, data.shape[0], 2, rule, threshold, window=window, chunk_rows=data.shape[0])
+    assert expected[0].shape[0] > 0
+    for chunk in (1, 7, 1000):
+        xmin, xmax = detect_events(reader, data.shape[0], 2, rule, threshold, window=window, chunk_rows=chunk)
+        np.testing.assert_array_equal(xmin, expected[0])
+        np.testing.assert_array_equal(xmax, expected[1])
+
+
+def test_threshold_intervals_match_a_loop():
+    data = _data(rows=2000)
+    x, y = data[:, 0], data[:, 2]
+    detector = EventDetector(EventRules.threshold, 0.8)
+    detector.feed(x, y)
+    xmin, xmax = detector.finish()
+
+    expected = []
+    start = None
+    for k in range(x.shape[0]):
+        if y[k] > 0.8 and start is None:
+            start = x[k]
+        elif y[k] <= 0.8 and start is not None:
+            expected.append((start, x[k - 1]))
+            start = None
+    if start is not None:
+        expected.append((start, x[-1]))
+    np.testing.assert_array_equal(np.column_stack((xmin, xmax)), np.array(expected).reshape(-1, 2))
+
+
+def test_merge_intervals():
+    xmin = np.array([0.0, 2.0, 10.0, 11.5, 20.0])
+    xmax = np.array([1.0, 3.0, 11.0, 12.0, 20.1])
+    merged = merge_intervals(xmin, xmax, gap=1.0)
+    np.testing.assert_array_equal(merged[0], [0.0, 10.0, 20.0])
+    np.testing.assert_array_equal(merged[1], [3.0, 12.0, 20.1])
+    merged = merge_intervals(xmin, xmax, gap=1.0, min_duration=0.5)
+    np.testing.assert_array_equal(merged[0], [0.0, 10.0])
+    assert merge_intervals(np.empty(0), np.empty(0), gap=1.0)[0].shape == (0,)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from h5_loader import decode_block
+
+
+def _records(rows=10_000):
+    dtype = np.dtype([('timestamp', '<u4'), ('eeg', '<f4', (2,)), ('flag', 'i1')])
+    arr = np.zeros(rows, dtype=dtype)
+    arr['timestamp'] = np.arange(rows) * 4
+    arr['eeg'] = np.random.default_rng(0).normal(size=(rows, 2))
+    arr['flag'] = np.arange(rows) % 3 - 1
+    return arr
+
+
+def test_decode_structured_block():
+    arr = _records()
+    decoded = decode_block(arr)
+    assert decoded.dtype == np.float64
+    expected = np.column_stack((arr['timestamp'], arr['eeg'], arr['flag'])).astype('float64')
+    np.testing.assert_array_equal(decoded, expected)
+
+
+@pytest.mark.parametrize('chunk', [1, 333, 4096])
+def test_decode_does_not_depend_on_chunk_size(chunk):
+    arr = _records()
+    whole = decode_block(arr)
+    out = np.empty(shape=(chunk, whole.shape[1]))
+    parts = [decode_block(arr[start:start + chunk], out[:arr[start:start + chunk].shape[0]]).copy()
+             for start in range(0, arr.shape[0], chunk)]
+    np.testing.assert_array_equal(np.vstack(parts), whole)
+
+
+def test_decode_plain_array():
+    arr = np.arange(12, dtype='int16').reshape(4, 3)
+    np.testing.assert_array_equal(decode_block(arr), arr.astype('float64'))
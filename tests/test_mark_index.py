@@ -0,0 +1,60 @@
+import numpy as np
+
+from mark_index import MarkIndex, MarkArrays
+
+
+class _Mark:
+    def __init__(self, xmin, xmax):
+        self.xmin = xmin
+        self.xmax = xmax
+
+
+def _marks(count=200, seed=0):
+    rng = np.random.default_rng(seed)
+    edges = np.sort(rng.choice(100_000, size=2 * count, replace=False)).astype('float64')
+    return [_Mark(a, b) for a, b in edges.reshape(-1, 2)]
+
+
+def test_assign_does_not_depend_on_chunk_size():
+    index = MarkIndex(_marks())
+    x = np.arange(0, 100_000, 0.7)
+    whole = index.assign(x)
+    for chunk in (1, 17, 4096):
+        parts = np.concatenate([index.assign(x[start:start + chunk]) for start in range(0, x.shape[0], chunk)])
+        np.testing.assert_array_equal(parts, whole)
+
+
+def test_assign_matches_a_linear_scan():
+    marks = _marks(50)
+    index = MarkIndex(marks)
+    x = np.linspace(-10, 100_010, 5000)
+    expected = np.full(x.shape, -1)
+    for pos, mark in enumerate(index.marks):
+        expected[(x >= mark.xmin) & (x <= mark.xmax)] = pos
+    np.testing.assert_array_equal(index.assign(x), expected)
+
+
+def test_insert_one_by_one_equals_bulk():
+    marks = _marks()
+    index = MarkIndex()
+    for mark in marks[::-1]:
+        index.insert(mark)
+    bulk = MarkIndex(marks)
+    np.testing.assert_array_equal(index.xmin, bulk.xmin)
+    np.testing.assert_array_equal(index.xmax, bulk.xmax)
+    assert list(index.marks) == list(bulk.marks)
+
+
+def test_collisions():
+    index = MarkIndex([_Mark(10.0, 20.0), _Mark(30.0, 40.0)])
+    assert index.has_collision(15.0, 35.0)
+    assert not index.has_collision(21.0, 29.0)
+    np.testing.assert_array_equal(index.collisions(np.array([0.0, 20.0, 21.0]), np.array([5.0, 25.0, 29.0])),
+                                  [False, True, False])
+
+
+def test_mark_arrays_are_sorted_with_their_colors():
+    marks = MarkArrays(np.array([30.0, 10.0]), np.array([40.0, 20.0]), np.array([[1, 2, 3, 4], [5, 6, 7, 8]]))
+    np.testing.assert_array_equal(marks.xmin, [10.0, 30.0])
+    np.testing.assert_array_equal(marks.get_rgba(), [[5, 6, 7, 8], [1, 2, 3, 4]])
+    np.testing.assert_array_equal(marks.assign(np.array([15.0, 25.0, 35.0])), [0, -1, 1])
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from mark_stats import compute_interval_stats, compute_interval_stats_rows
+
+
+def _data(rows=50_000, channels=3, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack((np.arange(rows) * 2.0, rng.normal(size=(rows, channels))))
+
+
+def _intervals(seed=1):
+    rng = np.random.default_rng(seed)
+    edges = np.sort(rng.uniform(-100, 100_100, size=400)).reshape(-1, 2)
+    # пустой интервал между отсчётами
+    edges[0] = (1000.5, 1001.5)
+    return edges[:, 0], edges[:, 1]
+
+
+def test_interval_stats_match_numpy():
+    data = _data()
+    xmin, xmax = _intervals()
+    stats = compute_interval_stats(data[:, 0], data[:, 1:], xmin, xmax)
+    for k in range(xmin.shape[0]):
+        values = data[(data[:, 0] >= xmin[k]) & (data[:, 0] <= xmax[k]), 1:]
+        assert stats['count'][k] == values.shape[0]
+        if not values.shape[0]:
+            assert np.isnan(stats['mean'][k]).all()
+            continue
+        np.testing.assert_allclose(stats['mean'][k], values.mean(axis=0))
+        np.testing.assert_allclose(stats['std'][k], values.std(axis=0), atol=1e-12)
+        np.testing.assert_array_equal(stats['min'][k], values.min(axis=0))
+        np.testing.assert_array_equal(stats['max'][k], values.max(axis=0))
+
+
+@pytest.mark.parametrize('block_rows', [1, 97, 4096, 1 << 20])
+def test_stats_do_not_depend_on_block_size(block_rows):
+    data = _data()
+    xmin, xmax = _intervals()
+    expected = compute_interval_stats(data[:, 0], data[:, 1:], xmin, xmax)
+    starts = np.searchsorted(data[:, 0], xmin, side='left')
+    stops = np.searchsorted(data[:, 0], xmax, side='right')
+    if block_rows == 1:
+        # по одной строке - только часть интервалов, иначе тест долгий
+        starts, stops, xmin, xmax = starts[:20], stops[:20], xmin[:20], xmax[:20]
+        expected = compute_interval_stats(data[:, 0], data[:, 1:], xmin, xmax)
+    stats = compute_interval_stats_rows(lambda start, stop: data[start:stop], starts, stops, xmin, xmax, 3,
+                                        block_rows=block_rows)
+    for name, values in expected.items():
+        np.testing.assert_allclose(stats[name], values, equal_nan=True, rtol=1e-9, atol=1e-12)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from plot_pyramid import MinMaxPyramid
+
+
+def _signal(rows=50_000, channels=3, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack((np.arange(rows) * 0.5, rng.normal(size=(rows, channels)).cumsum(axis=0)))
+
+
+def _extended(data, chunk, **kwargs):
+    pyramid = MinMaxPyramid(data.shape[1] - 1, **kwargs)
+    for start in range(0, data.shape[0], chunk):
+        pyramid.extend(data[start:start + chunk])
+    return pyramid
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 64, 1000, 33_333])
+def test_extend_equals_build(chunk):
+    data = _signal(rows=20_000 if chunk == 1 else 50_000)
+    built = MinMaxPyramid.build(data, base=8, factor=4, levels=4)
+    extended = _extended(data, chunk, base=8, factor=4, levels=4)
+    assert extended.rows() == built.rows() == data.shape[0]
+    for level in range(built.levels):
+        np.testing.assert_array_equal(extended.get_level(level), built.get_level(level))
+
+
+def test_levels_hold_bucket_extremes():
+    data = _signal(rows=4096, channels=2)
+    pyramid = MinMaxPyramid.build(data, base=8, factor=4, levels=3)
+    for level in range(pyramid.levels):
+        size = pyramid.bucket_size(level)
+        rows = pyramid.get_level(level)
+        buckets = data.reshape(-1, size, 3)
+        np.testing.assert_array_equal(rows[:, 0], buckets[:, 0, 0])
+        np.testing.assert_array_equal(rows[:, 1:3], buckets[:, :, 1:].min(axis=1))
+        np.testing.assert_array_equal(rows[:, 3:], buckets[:, :, 1:].max(axis=1))
+
+
+@pytest.mark.parametrize('chunk', [5, 999])
+def test_envelope_equals_slice_of_the_whole_level(chunk):
+    data = _signal(rows=30_001)
+    pyramid = _extended(data, chunk, base=8, factor=4, levels=4)
+    for level in range(pyramid.levels):
+        full_x, full_y = pyramid.get_envelope(level)
+        for xmin, xmax in ((None, None), (100.0, 5000.0), (-10.0, 3.0), (14_000.0, 20_000.0)):
+            x, y = pyramid.get_envelope(level, xmin, xmax)
+            rows = pyramid.get_level(level)
+            start = 0 if xmin is None else max(0, int(np.searchsorted(rows[:, 0], xmin)) - 1)
+            stop = rows.shape[0] if xmax is None else \
+                min(rows.shape[0], int(np.searchsorted(rows[:, 0], xmax, side='right')) + 1)
+            np.testing.assert_array_equal(x, full_x[2 * start:2 * stop])
+            np.testing.assert_array_equal(y, full_y[2 * start:2 * stop])
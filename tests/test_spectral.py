@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import spectral
+from spectral import compute_spectrum, segment_power
+
+
+def _signal(rows=40_000, sample_rate=250.0):
+    t = np.arange(rows) / sample_rate
+    rng = np.random.default_rng(0)
+    return np.column_stack((t, np.sin(2 * np.pi * 10 * t) + 0.1 * rng.normal(size=rows)))
+
+
+@pytest.mark.parametrize('max_columns', [4000, 100])
+@pytest.mark.parametrize('chunk_segments', [1, 3, 50])
+def test_spectrum_does_not_depend_on_chunk_size(monkeypatch, chunk_segments, max_columns):
+    data = _signal()
+    # при 100 столбцах соседние окна усредняются группами
+    monkeypatch.setattr(spectral, 'MAX_SPECTROGRAM_COLUMNS', max_columns)
+
+    def reader(start, stop):
+        return data[start:stop]
+
+    expected = compute_spectrum(reader, data.shape[0], 1, 250.0, nperseg=128)
+    monkeypatch.setattr(spectral, 'CHUNK_SEGMENTS', chunk_segments)
+    spectrum = compute_spectrum(reader, data.shape[0], 1, 250.0, nperseg=128)
+    np.testing.assert_allclose(spectrum.psd, expected.psd, rtol=1e-10)
+    np.testing.assert_allclose(spectrum.spectrogram, expected.spectrogram, rtol=1e-10)
+    np.testing.assert_array_equal(spectrum.times, expected.times)
+
+
+def test_psd_is_the_mean_of_all_windows_and_finds_the_tone():
+    data = _signal()
+    spectrum = compute_spectrum(lambda start, stop: data[start:stop], data.shape[0], 1, 250.0, nperseg=250,
+                                noverlap=125)
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(250) / 250)
+    np.testing.assert_allclose(spectrum.psd, segment_power(data[:, 1], window, 125, 250.0).mean(axis=0))
+    assert spectrum.freqs[np.argmax(spectrum.psd)] == pytest.approx(10.0)